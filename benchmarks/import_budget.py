@@ -0,0 +1,62 @@
+"""
+Checks that the core game modules import quickly and without any of the heavy
+optional dependencies.
+
+Each measurement runs in a fresh interpreter so nothing is already cached in
+sys.modules. The check fails if a heavy module is imported or if the best time
+to import the core modules is over the budget.
+
+Usage:
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --budget 0.05
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_MODULES = ['hangman', 'hangman.engine', 'hangman.game', 'hangman.words', 'hangman.pool',
+                'hangman.leaderboard', 'hangman.history', 'hangman.simulate', 'hangman.server']
+HEAVY_MODULES = ['pandas', 'numpy', 'PIL', 'requests', 'ipywidgets', 'IPython']
+BUDGET = 0.15
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+def measure(modules = CORE_MODULES, runs = 5):
+    """Returns the best import time over several fresh interpreters, and any heavy modules imported."""
+    script = SCRIPT.format(modules=modules, heavy=HEAVY_MODULES)
+    best, heavy = float('inf'), set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        elapsed, loaded = json.loads(output)
+        best = min(best, elapsed)
+        heavy.update(loaded)
+    return best, sorted(heavy)
+
+def main():
+    parser = argparse.ArgumentParser(description="Enforce the import time budget of the core game modules.")
+    parser.add_argument('--budget', type=float, default=BUDGET, help="Maximum import time in seconds.")
+    args = parser.parse_args()
+    elapsed, heavy = measure()
+    print(f"Imported {len(CORE_MODULES)} core modules in {elapsed*1000:.1f} ms (budget {args.budget*1000:.0f} ms)")
+    failures = []
+    if heavy:
+        failures.append(f"heavy modules imported: {', '.join(heavy)}")
+    if elapsed > args.budget:
+        failures.append(f"import time is over budget by {(elapsed - args.budget)*1000:.1f} ms")
+    if failures:
+        print("Import budget exceeded:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmarks for importing the package, word selection, guessing, rendering and
+history persistence.
+
+Every benchmark runs offline against an in-memory word store. Results are written
+as json and compared against a stored baseline, and the run fails if any result
+is worse than the baseline by more than the tolerance.
+
+Usage:
+    python benchmarks/run.py                     # run and compare with baseline.json
+    python benchmarks/run.py --save-baseline     # run and store the results as the new baseline
+    python benchmarks/run.py --only new_game guess
+"""
+import argparse
+import builtins
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hangman.words import WordStore
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+BENCHMARKS = {}
+
+def benchmark(name, unit, higher_is_better = False):
+    """Registers a benchmark function which returns a single measurement."""
+    def register(function):
+        BENCHMARKS[name] = (function, unit, higher_is_better)
+        return function
+    return register
+
+def get_word_store(num_words = 50000, seed = 0):
+    """Builds a deterministic store of random words covering every difficulty and length."""
+    rng = random.Random(seed)
+    letters = 'etaoinshrdlucmfwypbgvkqjxz'
+    return WordStore.from_words((''.join(rng.choice(letters) for _ in range(rng.randint(2, 10))),
+                                 rng.randint(1, 10)) for _ in range(num_words))
+
+def per_call(function, repeat):
+    """Returns the best mean time per call over five runs."""
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+@benchmark('import_core', 'seconds')
+def bench_import_core():
+    """The time to import the core game modules in a fresh interpreter."""
+    from import_budget import measure
+    return measure()[0]
+
+@benchmark('new_game', 'seconds')
+def bench_new_game():
+    from hangman.game import HangmanGame
+    game = HangmanGame(word_source=get_word_store())
+    return per_call(lambda: game.__init__('Random', 'Random'), 20000)
+
+@benchmark('guess', 'guesses/second', higher_is_better=True)
+def bench_guess():
+    from hangman.game import HangmanGame
+    game = HangmanGame(word_source=get_word_store())
+    letters = 'etaoinshrdlucmfwypbgvkqjxz'
+    guesses = 0
+    elapsed = 0.0
+    for _ in range(5000):
+        game.__init__()
+        start = time.perf_counter()
+        for letter in letters:
+            if game.status != 0:
+                break
+            game.guess(letter)
+            guesses += 1
+        elapsed += time.perf_counter() - start
+    return guesses / elapsed
+
+@benchmark('png_encode', 'frames/second', higher_is_better=True)
+def bench_png_encode():
+    from hangman.image import render_png_frames
+    return 7 / per_call(render_png_frames, 20)
+
+@benchmark('get_encoded_image', 'seconds')
+def bench_get_encoded_image():
+    from hangman.image import HangmanImage
+    image = HangmanImage()
+    image.get_encoded_image()
+    return per_call(image.get_encoded_image, 100000)
+
+@benchmark('app_update', 'seconds')
+def bench_app_update():
+    """The cost of a letter click in the widget app, without a browser attached."""
+    from hangman.app import App
+    from hangman.game import HangmanGame
+    from hangman.image import HangmanImage
+    if not hasattr(builtins, 'display'):
+        builtins.display = lambda *args: None # provided by IPython inside a notebook
+    class NoHistory:
+        def add_game(self, user, score): pass
+        def get_player_stats(self, player): return '0%', 0
+    app = App(HangmanGame(word_source=get_word_store()), HangmanImage(), NoHistory(), True)
+    app.player_name = 'benchmark'
+    app.get_app()
+    def click():
+        if app.game.status != 0:
+            app.reset()
+        button = next(button for button in app.letter_buttons if not button.disabled)
+        button.click()
+    return per_call(click, 2000)
+
+def bench_add_game(num_players):
+    from hangman.history import History
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        history = History()
+        try:
+            for idx in range(num_players):
+                history.add_game(f"player{idx}", idx % 50)
+            rng = random.Random(0)
+            return per_call(lambda: history.add_game(f"player{rng.randrange(num_players)}", rng.randrange(50)), 2000)
+        finally:
+            history.finish_compaction()
+            if history.log_file is not None:
+                history.log_file.close()
+            os.chdir(cwd)
+
+for _num_players in (10, 1000, 100000):
+    benchmark(f'add_game_{_num_players}_players', 'seconds')(
+        lambda num_players=_num_players: bench_add_game(num_players))
+
+@benchmark('compact_100000_players', 'seconds')
+def bench_compact():
+    """The time add_game is blocked by a compaction, while the snapshot is written in the background."""
+    from hangman.history import History
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        history = History()
+        try:
+            for idx in range(100000):
+                history.add_game(f"player{idx}", idx % 50)
+            best = float('inf')
+            for _ in range(5):
+                history.finish_compaction()
+                start = time.perf_counter()
+                history.compact()
+                best = min(best, time.perf_counter() - start)
+            return best
+        finally:
+            history.finish_compaction()
+            if history.log_file is not None:
+                history.log_file.close()
+            os.chdir(cwd)
+
+def run(names):
+    results = {}
+    for name in names:
+        function, unit, higher_is_better = BENCHMARKS[name]
+        try:
+            value = function()
+        except ImportError as e:
+            print(f"{name:<28} skipped ({e})")
+            continue
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        print(f"{name:<28} {value:.6g} {unit}")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Returns a message for every result which is worse than its baseline by more than tolerance."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]['value']
+        ratio = expected / result['value'] if result['higher_is_better'] else result['value'] / expected
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {result['value']:.6g} {result['unit']} vs baseline "
+                               f"{expected:.6g} ({ratio:.2f}x worse)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Hangman benchmarks.")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help="Allowed slowdown relative to the baseline, e.g. 1.0 for 2x.")
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+    results = run(args.only)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        return
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except OSError:
+        print(f"No baseline found at {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Performance regressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+A local stand-in for the words API, serving the words in a word list file.
+
+Failures and slow responses can be injected to check how the word client
+behaves when the API is unreliable or down.
+
+Usage:
+    python benchmarks/stub_server.py words.txt --port 8001
+    python benchmarks/stub_server.py words.txt --fail-rate 0.5 --delay 2
+
+Then point the game at it with HttpWordSource('http://127.0.0.1:8001/words').
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hangman.words import WordStore
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers GET /words with the same parameters as the words API."""
+    def do_GET(self):
+        server = self.server
+        if server.delay:
+            time.sleep(server.delay)
+        if random.random() < server.fail_rate:
+            self.send_error(503)
+            return
+        query = {key: int(values[0]) for key, values in parse_qs(urlsplit(self.path).query).items()}
+        difficulty = query.get('difficulty')
+        if difficulty is None:
+            self.send_error(400)
+            return
+        words = [word for length in range(query.get('minLength', 2), query.get('maxLength', 11))
+                 if 0 < difficulty < len(server.store.buckets) and length < len(server.store.buckets[difficulty])
+                 for word in server.store.buckets[difficulty][length]]
+        start = query.get('start', 0)
+        body = '\n'.join(words[start:start+query.get('count', len(words))]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start(store, port = 0, fail_rate = 0.0, delay = 0.0):
+    """Starts a stub server in a background thread and returns it, along with its words URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.store = store
+    server.fail_rate = fail_rate
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/words"
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a word list like the words API.")
+    parser.add_argument('word_list')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds to wait before each response.")
+    args = parser.parse_args()
+    server, url = start(WordStore(args.word_list), args.port, args.fail_rate, args.delay)
+    print(f"Serving {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""
+A game of Hangman, playable in a Jupyter notebook or through the game server.
+
+The core game logic only uses the standard library. The widget app, PNG rendering
+and DataFrame tables import ipywidgets, PIL and pandas the first time they are
+used, so headless and server processes never load them.
+"""
+import importlib
+
+_EXPORTS = {'HangmanGame': 'hangman.game',
+            'GameState': 'hangman.engine',
+            'HangmanImage': 'hangman.image',
+            'History': 'hangman.history',
+            'WordStore': 'hangman.words',
+            'App': 'hangman.app'}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
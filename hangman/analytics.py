@@ -0,0 +1,229 @@
+"""
+Rescores the difficulty of the target words from the results in the game log.
+
+Each line of logs.txt holds "player word won difficulty". The log and any rotated
+segments (logs.txt.1, logs.txt.2.gz, ...) are streamed in fixed size chunks, so
+memory use depends on the number of distinct words rather than the size of the
+log. The totals, along with the first bytes and offset of the last segment read,
+are saved in a state file so that each run only reads the games appended since
+the last one.
+
+The rescored table contains:
+    levels:  The difficulties in each level, ordered by their empirical win rate,
+             which get_word_length_and_difficulty uses in place of DIFFICULTY_MAP.
+    buckets: The games, wins and win rate for each "difficulty,length" bucket.
+    words:   The rescored difficulty of every word played at least min_games times.
+
+Usage:
+    python -m hangman.analytics
+    python -m hangman.analytics --log logs.txt --output difficulty.json --min-games 5
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+
+LOG_FILE = 'logs.txt'
+STATE_FILE = 'analytics.json'
+DIFFICULTY_FILE = 'difficulty.json'
+CHUNK_SIZE = 1 << 20
+HEAD_SIZE = 64
+LEVEL_SIZES = [('Easy', 3), ('Medium', 4), ('Hard', 3)]
+DIFFICULTIES = range(1, 11)
+
+def read_lines(f, chunk_size = CHUNK_SIZE):
+    """Yields each complete line of a binary file, reading it in chunks. A partial final line is not yielded."""
+    pending = b''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+
+def parse_records(lines):
+    """Yields (word, won, difficulty) for each well formed log line."""
+    for line in lines:
+        fields = line.decode('utf-8', 'replace').rsplit(None, 3) # player names may contain spaces
+        if len(fields) == 4 and fields[2] in ('0', '1') and fields[3].isdigit():
+            yield fields[1].lower(), int(fields[2]), int(fields[3])
+
+def open_log(path):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+def get_head(path):
+    with open_log(path) as f:
+        return f.read(HEAD_SIZE).decode('latin-1')
+
+def get_rotated_logs(path):
+    """Returns the rotated segments of a log from newest to oldest."""
+    directory, name = os.path.split(path)
+    pattern = re.compile(re.escape(name) + r'\.(\d+)(\.gz)?$')
+    segments = []
+    for entry in os.listdir(directory or '.'):
+        match = pattern.match(entry)
+        if match:
+            segments.append((int(match.group(1)), os.path.join(directory, entry)))
+    return [segment for _, segment in sorted(segments)]
+
+class LogAnalyzer:
+    """
+    Accumulates per word win rates from the game log across runs.
+
+    Attributes:
+        log_path (str): The live log file written by History.log_game.
+        state_path (str): The file holding the totals and the position reached in the log.
+    """
+    def __init__(self, log_path = LOG_FILE, state_path = STATE_FILE):
+        self.log_path = log_path
+        self.state_path = state_path
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        self.offset = state.get('offset', 0)
+        self.head = state.get('head', '')
+        self.previous_head = state.get('previous_head') # the first bytes of the segment before it
+        self.words = state.get('words', {}) # word: [games, wins, difficulty]
+
+    def save(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'offset': self.offset, 'head': self.head, 'previous_head': self.previous_head,
+                       'words': self.words}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def add(self, records):
+        """Adds (word, won, difficulty) records to the totals and returns how many were added."""
+        num_records = 0
+        for word, won, difficulty in records:
+            stats = self.words.get(word)
+            if stats is None:
+                stats = self.words[word] = [0, 0, difficulty]
+            stats[0] += 1
+            stats[1] += won
+            stats[2] = difficulty
+            num_records += 1
+        return num_records
+
+    def read(self, path, offset = 0):
+        """Adds the records in a log file after offset and returns the offset of the first unread byte."""
+        with open_log(path) as f:
+            if offset:
+                f.seek(offset)
+            def lines():
+                nonlocal offset
+                for line in read_lines(f):
+                    offset += len(line) + 1
+                    yield line
+            self.add(parse_records(lines()))
+        return offset
+
+    def update(self):
+        """
+        Reads every game logged since the previous update.
+
+        Segments are recognised by their first bytes, since rotation renames and
+        compresses them. The rest of the segment read last time is read from the
+        saved offset, followed by every newer segment in full, oldest first. If
+        that segment can't be found, such as on the first update, every segment is read.
+        """
+        segments = list(reversed(get_rotated_logs(self.log_path)))
+        if os.path.exists(self.log_path):
+            segments.append(self.log_path)
+        heads = [get_head(path) for path in segments]
+        start, offset = self.find_segment(segments, heads)
+        if start < len(segments):
+            for pos in range(start, len(segments)):
+                offset = self.read(segments[pos], offset if pos == start else 0)
+            self.offset = offset
+            self.head = heads[-1][:offset]
+            self.previous_head = heads[-2] if len(segments) > 1 else None
+        self.save()
+
+    def find_segment(self, segments, heads):
+        """Returns the position in segments to continue reading from and the offset within it."""
+        if self.head:
+            for pos in reversed(range(len(segments))):
+                if heads[pos].startswith(self.head):
+                    if os.path.getsize(segments[pos]) < self.offset and not segments[pos].endswith('.gz'):
+                        return pos, 0 # truncated in place
+                    return pos, self.offset
+        elif self.previous_head is not None:
+            for pos in reversed(range(len(segments))):
+                if heads[pos].startswith(self.previous_head):
+                    return pos + 1, 0 # the segment after it was empty when it was last read
+        return 0, 0
+
+    def get_buckets(self):
+        """Returns [games, wins] for each (difficulty, length) bucket."""
+        buckets = {}
+        for word, (games, wins, difficulty) in self.words.items():
+            stats = buckets.setdefault((difficulty, len(word)), [0, 0])
+            stats[0] += games
+            stats[1] += wins
+        return buckets
+
+    def get_table(self, min_games = 5, prior_games = 20):
+        """
+        Builds the rescored difficulty table.
+
+        Win rates are smoothed towards the overall win rate by adding prior_games
+        games at that rate, so difficulties and words with few games stay close to
+        the average. The difficulties are split into levels by win rate, and each
+        word is given the difficulty whose win rate is closest to its own.
+        """
+        buckets = self.get_buckets()
+        games = sum(stats[0] for stats in buckets.values())
+        wins = sum(stats[1] for stats in buckets.values())
+        overall = wins / games if games else 0.5
+        totals = {difficulty: [0, 0] for difficulty in DIFFICULTIES}
+        for (difficulty, _), (bucket_games, bucket_wins) in buckets.items():
+            if difficulty in totals:
+                totals[difficulty][0] += bucket_games
+                totals[difficulty][1] += bucket_wins
+        def smooth(games, wins, prior):
+            return (wins + prior*prior_games) / (games + prior_games)
+        rates = {difficulty: smooth(games, wins, overall) for difficulty, (games, wins) in totals.items()}
+        ordered = sorted(DIFFICULTIES, key=lambda difficulty: (-round(rates[difficulty], 6), difficulty))
+        levels, start = {}, 0
+        for level, size in LEVEL_SIZES:
+            levels[level] = sorted(ordered[start:start+size])
+            start += size
+        words = {}
+        for word, (games, wins, difficulty) in self.words.items():
+            if games >= min_games:
+                rate = smooth(games, wins, rates.get(difficulty, overall))
+                words[word] = min(DIFFICULTIES, key=lambda dif: (abs(rates[dif] - rate), dif))
+        return {'levels': levels,
+                'buckets': {f"{difficulty},{length}": {'games': games, 'wins': wins, 'win_rate': wins/games}
+                            for (difficulty, length), (games, wins) in sorted(buckets.items())},
+                'words': words}
+
+def write_table(table, path = DIFFICULTY_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(table, f)
+    os.replace(tmp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore word difficulty from the game log.")
+    parser.add_argument('--log', default=LOG_FILE)
+    parser.add_argument('--state', default=STATE_FILE)
+    parser.add_argument('--output', default=DIFFICULTY_FILE)
+    parser.add_argument('--min-games', type=int, default=5,
+                        help="The number of games a word needs before it is rescored.")
+    args = parser.parse_args()
+    analyzer = LogAnalyzer(args.log, args.state)
+    analyzer.update()
+    table = analyzer.get_table(args.min_games)
+    write_table(table, args.output)
+    print(f"{len(analyzer.words)} words played, {len(table['words'])} rescored")
+    for level, difficulties in table['levels'].items():
+        print(f"{level:<8} {difficulties}")
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,23 @@
+import html
 from ipywidgets import widgets
-import time
 from IPython.display import clear_output
+from .pool import WordPool
+from .snapshot import pack_game, unpack_game
+from .words import HttpWordSource
 
 class App:
     """
     Contains all of the UI elements for interacting with the game.
-    
+
+    The widget tree is built once. After every guess only the widget traits whose
+    values have changed are updated, so each click sends the browser just the
+    changes instead of a new layout.
+
     Attributes:
         game (HangmanGame): A class containing the Hangman gameplay logic.
         image (HangmanImage): A class which creates the image of the hanging man,
                              one body part at a time following incorrect guesses.
-        history (History): A class which stores statistics on completed games to track 
+        history (History): A class which stores statistics on completed games to track
                           player's scores and win percentages.
         start (bool): A flag indicating whether or not to display the start screen.
     """
@@ -20,28 +27,50 @@ class App:
         self.history = history
         self.word_length = self.game.word_length
         self.difficulty = self.game.difficulty
+        self.guessed_words = []
+        self.displayed = False
+        self.get_word_pool()
         self.get_word_length_setter()
         self.get_difficulty_setter()
         self.get_letter_buttons()
+        self.build_app()
         if start:
             self.get_open_screen()
         else:
             self.get_app()
-            
+
+    def get_word_pool(self):
+        """
+        Wraps a remote word source in a prefetching pool so that resetting the game
+        takes a word which is already available instead of waiting on the API. Words
+        which aren't ready yet are taken from the client's cache of earlier words.
+        """
+        if isinstance(self.game.word_source, HttpWordSource):
+            source = self.game.word_source
+            self.game.word_source = WordPool(source, fallback=source.client.cache)
+        self.prefetch_words()
+
+    def prefetch_words(self):
+        """Fetches words for the next game with the current settings and player in the background."""
+        if isinstance(self.game.word_source, WordPool):
+            self.game.word_source.prefill(self.word_length, self.difficulty, self.game.seen)
+
     def guess(self, guess):
         """
         Sends the guessed letter or word to the game class and receives a response
         indicating whether or not the guess was correct.
         """
-        correct_guess = self.game.guess(guess)
+        if self.game.status != 0:
+            return
+        correct_guess = self.game.guess(guess.description if guess.description else guess.value)
         if not correct_guess:
             self.image.draw_next()
         if self.game.status != 0:
             self.disable_all_letters()
             self.history.add_game(self.player_name, self.game.calculate_score())
         if hasattr(guess, "value"):
-            self.add_guessed_word(guess) 
-        
+            self.add_guessed_word(guess)
+
     def get_open_screen(self, *args):
         """Displays the opening screen where player enters their name."""
         header = widgets.HTML(f"<h1><font color='black'>Welcome To Hangman!</h1>",
@@ -51,30 +80,38 @@ class App:
         self.name_field.on_submit(self.get_app)
         self.start_button.on_click(self.get_app)
         app = widgets.AppLayout(header=header,center=center)
+        self.displayed = False
         clear_output()
         display(app)
-        
+
     def get_hangman_image(self):
         """Builds a widget to display the hangman image."""
-        self.hangman_image = widgets.Image(value=self.image.get_encoded_image())
-        
+        self.hangman_image = widgets.Image(value=self.image.get_encoded_image(),
+                                           format=self.image.widget_format)
+
     def get_name_field(self):
         """Builds a text field widget for players to enter their name."""
         self.name_field = widgets.Text(placeholder="Enter Your Name")
         self.start_button = widgets.Button(description="Start Game", disabled=True)
         self.name_field.observe(self.enable_start_game_, names=['value'])
         self.name_box = widgets.HBox([self.name_field, self.start_button])
-        
+
     def enable_start_game_(self, _):
         """Checks to see if a name has been entered in the name field."""
         if self.name_field.value != '':
-            self.player_name = self.name_field.value
+            self.set_player(self.name_field.value)
             self.enable_start_game()
-            
+
+    def set_player(self, player_name):
+        """Sets the current player, whose new games avoid the words they have already seen."""
+        self.player_name = player_name
+        self.game.seen = self.history.get_seen_words(player_name)
+        self.prefetch_words()
+
     def enable_start_game(self):
         """Enables the start game button when a name has been entered."""
         self.start_button.disabled=False
-        
+
     def get_letter_buttons(self):
         """Builds buttons enabling the player to guess each letter of the alphabet"""
         self.letter_buttons = [widgets.Button(description = chr(n),
@@ -88,66 +125,61 @@ class App:
             button.on_click(self.guess)
             button.on_click(self.get_app)
         self.letter_button_box = widgets.HBox(self.letter_buttons)
-        
+
     def letter_button_handler(self, button):
         """Disables the letter buttons after they have been clicked on."""
         button.disabled = True
         button.tooltip = ""
-        
+
     def enable_all_letter_buttons(self):
         """Reset all letter buttons when a new game is started."""
         for button in self.letter_buttons:
             button.disabled = False
-            button.on_click(self.guess)
-            button.on_click(self.get_app)
-            
+            button.tooltip = f"Click to guess {button.description}."
+
     def disable_all_letters(self):
         """Disables all of the letter buttons when the game is over."""
         for button in self.letter_buttons:
             button.disabled = True
             button.tooltip = ""
-            
+
     def get_guess_word(self):
         """Builds a text field widget enabling players to guess the full word."""
         self.guess_word = widgets.Text(placeholder = "Guess the mystery word")
         self.guess_word.layout.width = "260px"
         self.guess_word.layout.margin = "5px 0px 0px 250px"
-        self.guess_word.observe(self.enable_guess_word, names=['value'])
-        
-    def enable_guess_word(self, _):
+        self.guess_word.on_submit(self.submit_guess_word)
+
+    def submit_guess_word(self, _):
         """Enforces that the player can only guess a word if it has the same length as the target word."""
         if len(self.guess_word.value) == len(self.game.target_word):
-            self.guess_word.on_submit(self.guess)
-            self.guess_word.on_submit(self.get_app)
-        else:
-            self.guess_word.on_submit(self.guess, remove=True)
-            self.guess_word.on_submit(self.get_app, remove=True)
-    
+            self.guess(self.guess_word)
+            self.guess_word.value = ''
+            self.get_app()
+
     def add_guessed_word(self, word):
         """If a player guesses a word, the word gets added to a list and displayed."""
-        if not hasattr(self, "guessed_words"):
-            self.guessed_words = []
         self.guessed_words.append(word.value)
-        
+        self.guess_list.children += (widgets.HTML(f"<h4>{word.value}</h4>"),)
+
     def get_guess_list(self):
-        """Displays a list of words that have been guessed."""
-        self.guess_list = [widgets.HTML(f"<h4>{word}</h4>") for word in self.guessed_words]
-        self.guess_list = widgets.VBox([widgets.HTML("<h3><u>Guessed Words:</u></h3>")] + self.guess_list)
+        """Builds the list of words that have been guessed."""
+        self.guess_list = widgets.VBox([widgets.HTML("<h3><u>Guessed Words:</u></h3>")])
         self.guess_list.layout.margin = "0px 0px 0px -140px"
-        
+
     def get_word_length_setter(self):
         """Builds a dropdown widget enabling player to set the length of the target word."""
         self.word_length_setter = widgets.Dropdown(description = "Word Length",
-                                            options = ['Short','Medium','Long','Random'],
+                                            options = ['Short','Medium','Long','Random','Phrase'],
                                             value=self.word_length,
                                             layout=widgets.Layout(height="auto",width='180px'))
         self.word_length_setter.observe(self.set_word_length, names=['value'])
-        
+
     def set_word_length(self, _):
         """Sets the value of word length and resets the game."""
         self.word_length = self.word_length_setter.value
         self.reset()
-        
+
     def get_difficulty_setter(self):
         """Builds a dropdown widget enabling player to set the difficulty of the target word."""
         self.difficulty_setter = widgets.Dropdown(description = "Difficulty",
@@ -155,160 +187,212 @@ class App:
                                        value = self.difficulty,
                                        layout=widgets.Layout(height="auto",width='180px'))
         self.difficulty_setter.observe(self.set_difficulty, names=['value'])
-        
+
     def set_difficulty(self, _):
         """Sets the difficulty level and resets the game."""
         self.difficulty = self.difficulty_setter.value
         self.reset()
-        
+
     def get_player_info(self):
-        """Gets player info/stats to be displayed in the app."""
-        player_name = widgets.HTML(f"<h3> Player: {self.player_name} </h3>",
-                                                    layout = widgets.Layout(margin="0px 0px 0px 100px"))
-        win_percentage, score = self.history.get_player_stats(self.player_name)
-        player_score = widgets.HTML(f"<h4> Total Score: {score} </h4>",
-                                                    layout = widgets.Layout(margin="0px 0px 0px 100px"))
-        player_win_percentage = widgets.HTML(f"<h4> Win Percentage: {win_percentage} </h4>",
-                                                    layout = widgets.Layout(margin="0px 0px 0px 100px"))
-        return widgets.VBox([player_name, player_score, player_win_percentage])
-    
+        """Builds the widgets which show the player info/stats in the app."""
+        margin = "0px 0px 0px 100px"
+        self.player_name_text = widgets.HTML(layout = widgets.Layout(margin=margin))
+        self.player_score = widgets.HTML(layout = widgets.Layout(margin=margin))
+        self.player_win_percentage = widgets.HTML(layout = widgets.Layout(margin=margin))
+        return widgets.VBox([self.player_name_text, self.player_score, self.player_win_percentage])
+
     def get_scoreboard(self):
-        """Creates a button allowing the player to view the historical leaderboard."""
+        """Creates a button allowing the player to show or hide the historical leaderboard."""
         self.scoreboard = widgets.Button(description="View Scoreboard")
         self.scoreboard.on_click(self.show_scoreboard)
         self.scoreboard.layout.margin = "20px 0px 0px 20px"
-        
+        self.scoreboard_table = widgets.HTML(layout=widgets.Layout(display='none', width='308px'))
+
     def show_scoreboard(self, _):
-        """Displays the leaderboard for 4 seconds then returns to the game screen."""
-        clear_output()
-        self.history.display_scoreboard()
-        time.sleep(4)
-        clear_output()
-        display(self.app)
-        
+        """Toggles the leaderboard, which is shown in place of the hangman image."""
+        showing = self.scoreboard_table.layout.display == 'none'
+        if showing:
+            self.update_scoreboard()
+        self.scoreboard_table.layout.display = None if showing else 'none'
+        self.hangman_image.layout.display = 'none' if showing else None
+        self.scoreboard.description = "Hide Scoreboard" if showing else "View Scoreboard"
+
+    def update_scoreboard(self):
+        """Renders the top 10 players from the history's cached leaderboard snapshot."""
+        rows = ''.join(f"<tr><td>{html.escape(player)}</td><td>{played}</td><td>{won}</td><td>{score}</td><td>{win_percentage}</td></tr>"
+                       for player, played, won, score, win_percentage in self.history.get_leaderboard_snapshot(10))
+        set_value(self.scoreboard_table, "<h3>Scoreboard</h3><table><tr><th>Player</th><th>Games Played</th>"
+                                         f"<th>Games Won</th><th>Total Score</th><th>Win Percentage</th></tr>{rows}</table>")
+
     def get_change_player(self):
         """Creates a button for switching players."""
         self.change_player = widgets.Button(description="Switch Players")
         self.change_player.on_click(self.change_players)
         self.change_player.layout = self.scoreboard.layout
-        
+
     def change_players(self, _):
         """Returns to the home screen and resets the app."""
         self.reset()
         self.get_open_screen()
-    
+
     def get_header(self):
         """
         Builds the header section for the Hangman app.
-        
+
         Contains:
             Mystery Word: A blank word representing the word to be guessed.
                           Letters are revealed following correct guesses.
             Remaining Guesses: The number of guesses remaining before the player loses the game.
             Player Info: The current players' name, score and win percentage.
-            
+        """
+        self.mystery_word = widgets.HTML(layout=widgets.Layout(width="500px"))
+        self.remaining_guesses_text = widgets.HTML(layout=widgets.Layout(height='auto'))
+        player_info = self.get_player_info()
+        self.header = widgets.HBox([widgets.VBox([self.mystery_word, self.remaining_guesses_text]),player_info])
+
+    def update_header(self):
+        """
+        Updates the header to match the current game.
+
         The appearence of the header section is dependent on the status of the current game.
         """
         info = {-1:['red', self.game.target_word],
-                0:['black',' '.join(self.game.word)],
+                0:['black', self.game.display],
                 1:['green', self.game.target_word]}
-        mystery_word = widgets.HTML(f"<h1><font color={info[self.game.status][0]}>Mystery Word:\
-                                    {info[self.game.status][1]}</h1>",
-                                    layout=widgets.Layout(width="500px"))
-        remaining_guesses = widgets.HTML(f"<h2><font color='black'>Remaining Guesses:\
-                                         {str(self.game.remaining_guesses)}</h2>",
-                                         layout=widgets.Layout(height='auto'))
-        player_info = self.get_player_info()
-        self.header = widgets.HBox([widgets.VBox([mystery_word, remaining_guesses]),player_info])
-        
+        set_value(self.mystery_word, f"<h1><font color={info[self.game.status][0]}>Mystery Word:\
+                                    {info[self.game.status][1]}</h1>")
+        set_value(self.remaining_guesses_text, f"<h2><font color='black'>Remaining Guesses:\
+                                         {str(self.game.remaining_guesses)}</h2>")
+        win_percentage, score = self.history.get_player_stats(self.player_name)
+        set_value(self.player_name_text, f"<h3> Player: {html.escape(self.player_name)} </h3>")
+        set_value(self.player_score, f"<h4> Total Score: {score} </h4>")
+        set_value(self.player_win_percentage, f"<h4> Win Percentage: {win_percentage} </h4>")
+
     def get_message(self):
         """A message that is displayed after the game is finished (win/lose)."""
-        text = "You Win!" if self.game.status == 1 else "You Lose"
-        return widgets.HTML(f"<h1><font color='blue'> {text} </h1>",
-                           layout=widgets.Layout(margin=self.scoreboard.layout.margin))
-    
+        self.message = widgets.HTML(layout=widgets.Layout(margin=self.scoreboard.layout.margin))
+
     def get_play_again(self):
         """
         Creates a button allowing the player to play again.
-        
-        Button only becomes active after the game has ended.
+
+        Button only becomes visible after the game has ended.
         Clicking the button resets the app.
         """
-        play_again = widgets.Button(description="Play Again",
+        self.play_again = widgets.Button(description="Play Again",
                                          button_style="success")
-        play_again.on_click(self.reset)
-        play_again.layout.margin = self.scoreboard.layout.margin
-        return play_again
-        
+        self.play_again.on_click(self.reset)
+        self.play_again.layout.margin = self.scoreboard.layout.margin
+
     def get_left_sidebar(self):
         """
         Builds the left sidebar section of the app.
-        
+
         Contains:
             Difficulty Setter
             Word Length Setter
             View Scoreboard Button
-            Win/Lose Message (Only after game has ended)
-            Play Again Button (Only after game has ended)
+            Win/Lose Message (Only visible after game has ended)
+            Play Again Button (Only visible after game has ended)
         """
         self.get_scoreboard()
         self.get_change_player()
-        self.get_guess_word()
-        if self.game.status == 0:
-            self.left_sidebar = widgets.VBox([self.difficulty_setter,
-                                              self.word_length_setter,
-                                              self.scoreboard,
-                                              self.change_player])
-        else:
-            message = self.get_message()
-            play_again = self.get_play_again()
-            self.left_sidebar = widgets.VBox([self.difficulty_setter,
-                                              self.word_length_setter,
-                                              self.scoreboard,
-                                              self.change_player,
-                                              message,
-                                              play_again])
-    
+        self.get_message()
+        self.get_play_again()
+        self.left_sidebar = widgets.VBox([self.difficulty_setter,
+                                          self.word_length_setter,
+                                          self.scoreboard,
+                                          self.change_player,
+                                          self.message,
+                                          self.play_again])
+
+    def update_left_sidebar(self):
+        """Shows the win/lose message and play again button once the game has ended."""
+        display_style = 'none' if self.game.status == 0 else None
+        set_value(self.message, f"<h1><font color='blue'> {'You Win!' if self.game.status == 1 else 'You Lose'} </h1>")
+        set_value(self.message.layout, display_style, 'display')
+        set_value(self.play_again.layout, display_style, 'display')
+        in_progress = self.game.status == 0 and self.game.remaining_guesses < 6
+        set_value(self.difficulty_setter, in_progress, 'disabled')
+        set_value(self.word_length_setter, in_progress, 'disabled')
+
     def get_footer(self):
         """
         Builds the footer section of the app.
-        
+
         Contains:
             Letter Buttons
             Guess Word Field
         """
+        self.get_guess_word()
         footer_text = widgets.HTML("<h3>Click on a letter to guess it or try to guess the full word.</h3>",
-                                   layout = widgets.Layout(margin="0px 0px 0px 70px")) 
+                                   layout = widgets.Layout(margin="0px 0px 0px 70px"))
         self.footer =  widgets.VBox([footer_text, self.letter_button_box, self.guess_word])
         self.footer.layout.margin = "-60px 0px 0px 0px"
-        
-    def get_app(self, *args):
-        """Builds and displays the app using the widgets.AppLayout template."""
+
+    def build_app(self):
+        """Builds the widget tree for the app using the widgets.AppLayout template."""
         self.get_header()
         self.get_left_sidebar()
         self.get_hangman_image()
         self.get_footer()
+        self.get_guess_list()
         self.app = widgets.AppLayout(header=self.header,
                                      left_sidebar=self.left_sidebar,
-                                     center=self.hangman_image,
+                                     center=widgets.VBox([self.hangman_image, self.scoreboard_table]),
                                      footer=self.footer)
-        if self.game.status == 0 and self.game.remaining_guesses < 6:
-            self.difficulty_setter.disabled=True
-            self.word_length_setter.disabled=True
-        else:
-            self.difficulty_setter.disabled=False
-            self.word_length_setter.disabled=False
-        if hasattr(self, "guessed_words"):
-            self.get_guess_list()
-            self.app.right_sidebar = self.guess_list
-        clear_output(wait=True)
-        display(self.app)
-        
+
+    def get_app(self, *args):
+        """Updates the app to match the current game and displays it if it isn't already shown."""
+        self.update_header()
+        self.update_left_sidebar()
+        set_value(self.hangman_image, self.image.get_encoded_image())
+        if self.scoreboard_table.layout.display != 'none':
+            self.update_scoreboard()
+        set_value(self.guess_word, self.game.status != 0, 'disabled')
+        set_value(self.app, self.guess_list if self.guessed_words else None, 'right_sidebar')
+        if not self.displayed:
+            self.displayed = True
+            clear_output(wait=True)
+            display(self.app)
+
+    def snapshot(self):
+        """Returns a compact snapshot of the current game, which restore can resume after a kernel restart."""
+        return pack_game(self.game, self.image.idx, self.guessed_words, getattr(self, 'player_name', ''))
+
+    def restore(self, data):
+        """Resumes the game in a snapshot taken by snapshot, without requesting a new word."""
+        snapshot, _ = unpack_game(data, word_source=self.game.word_source)
+        self.game = snapshot.game
+        self.image.idx = snapshot.frame
+        self.set_player(snapshot.player)
+        self.word_length = self.game.word_length
+        self.difficulty = self.game.difficulty
+        for setter, handler, value in ((self.word_length_setter, self.set_word_length, self.word_length),
+                                       (self.difficulty_setter, self.set_difficulty, self.difficulty)):
+            setter.unobserve(handler, names=['value']) # changing the setters would start a new game
+            set_value(setter, value)
+            setter.observe(handler, names=['value'])
+        self.guessed_words = list(snapshot.guessed_words)
+        self.guess_list.children = self.guess_list.children[:1] + tuple(widgets.HTML(f"<h4>{word}</h4>")
+                                                                        for word in self.guessed_words)
+        for idx, button in enumerate(self.letter_buttons):
+            guessed = self.game.status != 0 or self.game.state.guessed >> idx & 1
+            button.disabled = bool(guessed)
+            button.tooltip = "" if guessed else f"Click to guess {button.description}."
+        self.get_app()
+
     def reset(self, *args):
         """Resets the app to start a new game."""
-        if hasattr(self, "guessed_words"):
-            del self.guessed_words
+        self.guessed_words = []
+        self.guess_list.children = self.guess_list.children[:1]
         self.image.__init__()
         self.game.__init__(self.word_length, self.difficulty)
-        self.get_letter_buttons()
+        self.enable_all_letter_buttons()
         self.get_app()
+        self.prefetch_words() # 'Random' settings draw a new difficulty for each game
+
+def set_value(widget, value, trait = 'value'):
+    """Sets a widget trait only when its value has changed, so unchanged traits are never sent."""
+    if getattr(widget, trait) != value:
+        setattr(widget, trait, value)
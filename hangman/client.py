@@ -0,0 +1,224 @@
+"""
+A resilient client for the words API.
+
+Requests share a pooled session, and each one has a connect and read timeout.
+Connection errors, timeouts and server errors are retried with exponential
+backoff. After failure_threshold requests fail in a row, a circuit breaker
+stops sending requests for reset_timeout seconds. After that, a single trial
+request decides whether to close the breaker again.
+
+Every word fetched is kept in an on-disk SQLite cache keyed by its
+(difficulty, length) bucket and index. The least recently used words are evicted
+once cache_size is reached. While the API is unavailable, words are served from
+the cache: the same word if it is cached, otherwise any cached word in the same
+bucket.
+"""
+import random
+import sqlite3
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_FILE = 'words_cache.db'
+
+class WordSourceUnavailable(Exception):
+    """Raised when the words API cannot be reached and the cache cannot answer instead."""
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing service until it has had time to recover.
+
+    Attributes:
+        failure_threshold (int): The number of consecutive failures which opens the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a trial call is allowed.
+    """
+    def __init__(self, failure_threshold = 5, reset_timeout = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def allow(self):
+        """Returns whether a call may be made now. Only one trial call is allowed while half open."""
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+class WordCache:
+    """
+    An on-disk least recently used cache of words, keyed by bucket and index.
+
+    Attributes:
+        path (str): The SQLite database file.
+        max_size (int): The maximum number of words kept.
+    """
+    def __init__(self, path = CACHE_FILE, max_size = 10000):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.clock = 0
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS words (
+                difficulty INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                word TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (difficulty, length, idx));
+            CREATE INDEX IF NOT EXISTS words_used ON words (used);
+            """)
+        self.clock = self.connection.execute("SELECT COALESCE(MAX(used), 0) FROM words").fetchone()[0]
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+
+    def put(self, difficulty, length, idx, word):
+        with self.lock:
+            self.clock += 1
+            self.connection.execute("INSERT OR REPLACE INTO words VALUES (?, ?, ?, ?, ?)",
+                                    (difficulty, length, idx, word, self.clock))
+            if self.clock % 100 == 0: # evicting in batches keeps each insert cheap
+                self.connection.execute("""
+                    DELETE FROM words WHERE used <= (
+                        SELECT used FROM words ORDER BY used DESC LIMIT 1 OFFSET ?)""", (self.max_size,))
+
+    def get(self, difficulty, length, idx = None):
+        """Returns the cached word at idx, or a random cached word from the bucket if it isn't cached."""
+        with self.lock:
+            row = None
+            if idx is not None:
+                row = self.connection.execute("""
+                    SELECT idx, word FROM words WHERE difficulty = ? AND length = ? AND idx = ?""",
+                    (difficulty, length, idx)).fetchone()
+            if row is None:
+                rows = self.connection.execute("""
+                    SELECT idx, word FROM words WHERE difficulty = ? AND length = ?""",
+                    (difficulty, length)).fetchall()
+                row = random.choice(rows) if rows else None
+            if row is None:
+                return None
+            self.clock += 1
+            self.connection.execute("UPDATE words SET used = ? WHERE difficulty = ? AND length = ? AND idx = ?",
+                                    (self.clock, difficulty, length, row[0]))
+            return row[1]
+
+    def get_word(self, min_length, max_length, difficulty, seen = None):
+        """
+        Returns a random cached word with min_length <= length < max_length, so the
+        cache can stand in for the API without any network access.
+        """
+        with self.lock:
+            rows = self.connection.execute("""
+                SELECT word FROM words WHERE difficulty = ? AND length >= ? AND length < ?""",
+                (difficulty, min_length, max_length)).fetchall()
+        if not rows:
+            raise ValueError(f"No cached words for difficulty {difficulty} "
+                             f"and lengths {min_length}-{max_length-1}")
+        return random.choice(rows)[0]
+
+class WordClient:
+    """
+    Fetches words from the words API with pooling, timeouts, retries, a circuit
+    breaker and an offline cache.
+
+    Attributes:
+        url (str): The address of the words endpoint.
+        timeout (tuple): The connect and read timeouts in seconds.
+        retries (int): The number of times a failed request is retried.
+        backoff (float): The delay before the first retry, doubled for each retry after it.
+        cache (WordCache): The cache of fetched words, or None to disable it.
+    """
+    def __init__(self, url, timeout = (3.05, 10), retries = 3, backoff = 0.5, pool_size = 8,
+                 failure_threshold = 5, reset_timeout = 30, cache_path = CACHE_FILE, cache_size = 10000):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.cache = WordCache(cache_path, cache_size) if cache_path is not None else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, params):
+        """
+        Returns the body of a request to the words API.
+
+        Raises WordSourceUnavailable if the circuit is open or every attempt failed.
+        Client errors such as a bad request are raised without retrying.
+        """
+        if not self.breaker.allow():
+            raise WordSourceUnavailable(f"{self.url} is unavailable after repeated failures")
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2**(attempt-1) * random.uniform(0.5, 1.5))
+            try:
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = e
+                continue
+            if response.status_code >= 500:
+                error = requests.HTTPError(f"{response.status_code} from {self.url}", response=response)
+                continue
+            self.breaker.record_success()
+            response.raise_for_status()
+            return response.text
+        self.breaker.record_failure()
+        raise WordSourceUnavailable(f"{self.url} failed after {self.retries + 1} attempts: {error}") from error
+
+    def get_words(self, difficulty, length, start = None, count = None):
+        """Returns the words in one bucket, optionally only count words from start."""
+        params = {'minLength':length,
+                  'maxLength':length+1,
+                  'difficulty':difficulty}
+        if start is not None:
+            params['start'] = start
+            params['count'] = count
+        text = self.get(params)
+        return [word for word in text.split('\n') if word]
+
+    def word_at(self, difficulty, length, idx):
+        """Returns a single word, falling back to the cache if the words API is unavailable."""
+        try:
+            words = self.get_words(difficulty, length, idx, 1)
+        except WordSourceUnavailable:
+            word = self.cache.get(difficulty, length, idx) if self.cache is not None else None
+            if word is None:
+                raise
+            return word
+        if not words:
+            raise WordSourceUnavailable(f"No word at index {idx} for difficulty {difficulty} and length {length}")
+        if self.cache is not None:
+            self.cache.put(difficulty, length, idx, words[0])
+        return words[0]
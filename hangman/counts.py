@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import os
+import threading
+import time
+from .client import WordClient
+
+COUNTS_FILE = 'counts.json'
+CHECKPOINT_FILE = 'counts.checkpoint.json'
+BUCKETS = [(dif, length) for dif in range(1, 11) for length in range(2, 11)]
+
+class CountsBuilder:
+    """
+    Builds the difficulty/word length counts matrix by requesting every bucket
+    from the words API concurrently.
+
+    Each finished bucket is written to a checkpoint file along with the time it
+    was fetched, so an interrupted build resumes where it stopped and stale
+    buckets can be refreshed without starting over.
+
+    Attributes:
+        url (str): The address of the words endpoint.
+        path (str): The file where the completed counts matrix is saved.
+        checkpoint_path (str): The file where finished buckets are recorded.
+        workers (int): The maximum number of concurrent requests.
+        timeout (float): Seconds to wait for each response.
+        client (WordClient): The client used for requests. Defaults to one without a word cache.
+    """
+    def __init__(self, url, path = COUNTS_FILE, checkpoint_path = CHECKPOINT_FILE,
+                 workers = 8, timeout = 30, client = None):
+        self.url = url
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.client = client or WordClient(url, timeout=(3.05, timeout), pool_size=workers, cache_path=None)
+        self.load_checkpoint()
+
+    def load_checkpoint(self):
+        """
+        Loads the finished buckets from the checkpoint file.
+
+        A counts matrix saved before checkpoints existed is imported with the
+        modification time of its file.
+        """
+        try:
+            with open(self.checkpoint_path) as f:
+                self.buckets = {tuple(map(int, key.split(','))): tuple(value)
+                                for key, value in json.load(f).items()}
+        except (OSError, ValueError):
+            self.buckets = {}
+            if os.path.exists(self.path):
+                fetched = os.path.getmtime(self.path)
+                with open(self.path) as f:
+                    counts = json.load(f)
+                for dif, length in BUCKETS:
+                    self.buckets[dif, length] = (counts[dif][length], fetched)
+
+    def save_checkpoint(self):
+        with self.lock:
+            data = {f"{dif},{length}": list(value) for (dif, length), value in self.buckets.items()}
+        write_json(self.checkpoint_path, data)
+
+    def fetch_bucket(self, dif, length):
+        """Requests the full word list for a single bucket and returns its size."""
+        return len(self.client.get_words(dif, length))
+
+    def fetch(self, buckets):
+        """
+        Fetches the given buckets concurrently, checkpointing each one as it finishes.
+
+        Buckets that fail are left out of the checkpoint so that the next build
+        retries them. The first error is raised once every request has finished.
+        """
+        error = None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch_bucket, *bucket): bucket for bucket in buckets}
+            for future in as_completed(futures):
+                try:
+                    count = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                with self.lock:
+                    self.buckets[futures[future]] = (count, time.time())
+                self.save_checkpoint()
+        if error is not None:
+            raise error
+
+    def missing_buckets(self):
+        return [bucket for bucket in BUCKETS if bucket not in self.buckets]
+
+    def stale_buckets(self, max_age):
+        """Returns the buckets which were fetched more than max_age seconds ago."""
+        oldest = time.time() - max_age
+        return [bucket for bucket in BUCKETS if self.buckets.get(bucket, (0, 0))[1] < oldest]
+
+    def get_matrix(self):
+        """Returns the counts matrix built from the finished buckets."""
+        counts = [[0 for _ in range(11)] for _ in range(11)]
+        with self.lock:
+            for (dif, length), (count, _) in self.buckets.items():
+                counts[dif][length] = count
+        return counts
+
+    def build(self):
+        """Fetches any buckets which have not been finished yet and saves the counts matrix."""
+        self.fetch(self.missing_buckets())
+        counts = self.get_matrix()
+        write_json(self.path, counts)
+        return counts
+
+    def refresh_in_background(self, max_age, callback):
+        """
+        Re-fetches stale buckets in a background thread.
+
+        The game continues to use its current matrix while the refresh runs, and
+        callback is called with the updated matrix once it has been saved. If any
+        bucket could not be fetched, the error is kept in refresh_error.
+        """
+        def refresh():
+            try:
+                self.fetch(self.stale_buckets(max_age))
+                self.refresh_error = None
+            except Exception as e: # the buckets which did finish are still used
+                self.refresh_error = e
+            counts = self.get_matrix()
+            write_json(self.path, counts)
+            callback(counts)
+        thread = threading.Thread(target=refresh, daemon=True)
+        thread.start()
+        return thread
+
+def write_json(path, data):
+    """Writes a json file atomically so that readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,210 @@
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+
+MAX_GUESSES = 6
+MAX_SCORED_LETTERS = 10 # the longest word, so a phrase never outscores the best possible word
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+BatchResult = namedtuple('BatchResult', ['status', 'remaining_guesses', 'score', 'num_guesses'])
+
+@lru_cache(maxsize=65536)
+def get_letter_masks(target_word):
+    """
+    Maps each letter of the alphabet to a bitmask of the positions where that
+    letter appears in the target word.
+
+    Returns a tuple of 26 position masks followed by the mask of every position
+    which holds a letter.
+    """
+    masks = [0]*26
+    for idx, letter in enumerate(target_word.lower()):
+        if letter in LETTERS:
+            masks[ord(letter)-97] |= 1 << idx
+    letters_mask = 0
+    for mask in masks:
+        letters_mask |= mask
+    return tuple(masks) + (letters_mask,)
+
+@lru_cache(maxsize=65536)
+def get_letter_positions(target_word):
+    """Maps each letter of the alphabet to a tuple of the positions where it appears in the target word."""
+    positions = [[] for _ in range(26)]
+    for idx, letter in enumerate(target_word.lower()):
+        if letter in LETTERS:
+            positions[ord(letter)-97].append(idx)
+    return tuple(map(tuple, positions))
+
+def calculate_score(status, difficulty, num_letters, remaining_guesses):
+    """
+    Arbitrary method for calculating the score achieved in a completed game, from
+    the number of letters which had to be guessed, up to MAX_SCORED_LETTERS.
+    """
+    if status == 1:
+        return difficulty * min(num_letters, MAX_SCORED_LETTERS) * remaining_guesses
+    return 0
+
+class GameState:
+    """
+    The state of a single game with no dependence on widgets or the word source.
+
+    Guessed letters are stored as a 26 bit mask and revealed letters as a mask over
+    the positions of the target word, so each game only holds a few integers.
+
+    The pattern shown to the player, and the spaced display built from it, are
+    created the first time they are requested and then updated in place, one
+    position per occurrence of each correct letter, so long phrases cost no more
+    per guess than short words.
+
+    Attributes:
+        target_word (str): The word to be guessed.
+        difficulty (int): The difficulty level of the target word.
+    """
+    __slots__ = ('target_word', 'difficulty', 'letter_masks', 'revealed',
+                 'guessed', 'remaining_guesses', 'status', 'pattern', 'display', 'display_text')
+
+    def __init__(self, target_word, difficulty = 1):
+        self.target_word = target_word
+        self.difficulty = difficulty
+        self.letter_masks = get_letter_masks(target_word)
+        full_mask = (1 << len(target_word)) - 1
+        self.revealed = full_mask & ~self.letter_masks[26] # characters which aren't letters are never hidden
+        self.guessed = 0
+        self.remaining_guesses = MAX_GUESSES
+        self.status = 0 # 0 = in progress, 1 = win, -1 = lose
+        self.pattern = None
+        self.display = None
+        self.display_text = None
+
+    @classmethod
+    def restore(cls, target_word, difficulty, guessed, remaining_guesses, status):
+        """
+        Rebuilds a game from the letters guessed so far. The revealed positions
+        follow from the guessed letters, or cover the whole word after a win.
+        """
+        state = cls(target_word, difficulty)
+        for idx in range(26):
+            if guessed >> idx & 1:
+                state.revealed |= state.letter_masks[idx]
+        if status == 1:
+            state.revealed = (1 << len(target_word)) - 1
+        state.guessed = guessed
+        state.remaining_guesses = remaining_guesses
+        state.status = status
+        return state
+
+    def guess(self, guess):
+        """
+        Verifies the guessed letter or word against the target word.
+
+        Decrements remaining_guesses following an incorrect guess and sets status
+        once the word has been revealed or the player runs out of guesses.
+
+        Parameters:
+            guess (str): The letter or word that was guessed by the player.
+
+        Returns:
+            correct_guess (bool): Indicates whether or not the guess was correct.
+        """
+        if self.status != 0:
+            return False
+        correct_guess = False
+        if len(guess) == 1:
+            idx = ord(guess.lower()) - 97
+            if 0 <= idx < 26:
+                self.guessed |= 1 << idx
+                mask = self.letter_masks[idx] & ~self.revealed
+            else:
+                mask = 0
+            if mask:
+                self.revealed |= mask
+                if self.pattern is not None:
+                    self.reveal(idx)
+                correct_guess = True
+            else:
+                self.lose_guess()
+            if self.revealed == (1 << len(self.target_word)) - 1:
+                self.status = 1
+        elif len(guess) == len(self.target_word):
+            if guess.lower() == self.target_word.lower():
+                self.revealed = (1 << len(self.target_word)) - 1
+                if self.pattern is not None:
+                    self.pattern[:] = self.target_word
+                    self.display = self.display_text = None
+                self.status = 1
+                correct_guess = True
+            else:
+                self.lose_guess()
+        return correct_guess
+
+    def lose_guess(self):
+        self.remaining_guesses -= 1
+        if self.remaining_guesses == 0:
+            self.status = -1
+
+    def reveal(self, idx):
+        """Shows every occurrence of the letter with index idx in the pattern."""
+        pattern, display, target_word = self.pattern, self.display, self.target_word
+        for pos in get_letter_positions(target_word)[idx]:
+            pattern[pos] = target_word[pos]
+            if display is not None:
+                display[2*pos] = target_word[pos]
+        self.display_text = None
+
+    def get_pattern(self):
+        """
+        Returns the target word as a list with unrevealed letters replaced by
+        underscores. The list is updated in place by later guesses and should not
+        be modified.
+        """
+        if self.pattern is None:
+            revealed = self.revealed
+            self.pattern = [letter if revealed >> idx & 1 else '_' for idx, letter in enumerate(self.target_word)]
+        return self.pattern
+
+    def get_display(self):
+        """
+        Returns the pattern as a string with a space between characters. The spaces
+        between the words of a phrase are shown as non-breaking spaces so they stay
+        visible in HTML.
+        """
+        if self.display is None:
+            pattern = self.get_pattern()
+            self.display = [' ']*(2*len(pattern) - 1)
+            self.display[::2] = ['\u00a0' if char == ' ' else char for char in pattern]
+        if self.display_text is None:
+            self.display_text = ''.join(self.display)
+        return self.display_text
+
+    def calculate_score(self):
+        num_letters = bin(self.letter_masks[26]).count('1') # spaces and punctuation are never guessed
+        return calculate_score(self.status, self.difficulty, num_letters, self.remaining_guesses)
+
+def play_batch(games, difficulties = None):
+    """
+    Plays many games without any widgets or I/O.
+
+    Parameters:
+        games: An iterable of (target_word, guesses) pairs where guesses is a
+               sequence of letters or words. Guesses after the game has ended are ignored.
+        difficulties: An optional sequence with the difficulty of each target word,
+                      used for scoring. Defaults to a difficulty of 1.
+
+    Returns:
+        BatchResult: Arrays holding the status, remaining guesses, score and number
+                     of guesses used for each game.
+    """
+    result = BatchResult(array('b'), array('b'), array('l'), array('H'))
+    for idx, (target_word, guesses) in enumerate(games):
+        state = GameState(target_word, difficulties[idx] if difficulties is not None else 1)
+        num_guesses = 0
+        for guess in guesses:
+            if state.status != 0:
+                break
+            state.guess(guess)
+            num_guesses += 1
+        result.status.append(state.status)
+        result.remaining_guesses.append(state.remaining_guesses)
+        result.score.append(state.calculate_score())
+        result.num_guesses.append(num_guesses)
+    return result
@@ -0,0 +1,208 @@
+"""
+A buffered writer for the game event logs.
+
+Events are collected in memory and written in batches, either once buffer_size
+bytes are waiting, flush_interval seconds after the first unwritten event, or at
+shutdown. Each log file stays open between batches and is rotated once it grows
+past max_bytes: logs.txt becomes logs.txt.1 (compressed to logs.txt.1.gz when
+compress is set), older segments shift up by one and only the newest backups
+are kept.
+
+The text log holds one "player word won difficulty" line per game, as read by
+hangman.analytics. The optional binary log also records every guess, as packed
+little endian records:
+
+    result: kind=1 (B), time (d), score (i), won (B), difficulty (B), player, word
+    guess:  kind=2 (B), time (d), elapsed (f), correct (B), remaining (B), player, word, guess
+
+Each string is stored as its utf-8 length (H) followed by its bytes.
+"""
+from collections import namedtuple
+import atexit
+import gzip
+import os
+import shutil
+import struct
+import threading
+import time
+
+LOG_FILE = 'logs.txt'
+RESULT, GUESS = 1, 2
+RESULT_HEADER = struct.Struct('<BdiBB')
+GUESS_HEADER = struct.Struct('<BdfBB')
+LENGTH = struct.Struct('<H')
+
+ResultEvent = namedtuple('ResultEvent', ['time', 'score', 'won', 'difficulty', 'player', 'word'])
+GuessEvent = namedtuple('GuessEvent', ['time', 'elapsed', 'correct', 'remaining_guesses', 'player', 'word', 'guess'])
+
+def pack_strings(*strings):
+    packed = []
+    for string in strings:
+        data = string.encode('utf-8')[:0xffff]
+        packed.append(LENGTH.pack(len(data)))
+        packed.append(data)
+    return b''.join(packed)
+
+def unpack_strings(data, offset, count):
+    strings = []
+    for _ in range(count):
+        length, = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        if offset + length > len(data):
+            raise struct.error("truncated string")
+        strings.append(data[offset:offset+length].decode('utf-8'))
+        offset += length
+    return strings, offset
+
+def read_events(path):
+    """Yields the ResultEvent and GuessEvent records in a binary log, ignoring a partially written final record."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    try:
+        while offset < len(data):
+            if data[offset] == RESULT:
+                _, finished, score, won, difficulty = RESULT_HEADER.unpack_from(data, offset)
+                strings, offset = unpack_strings(data, offset + RESULT_HEADER.size, 2)
+                yield ResultEvent(finished, score, won, difficulty, *strings)
+            elif data[offset] == GUESS:
+                _, guessed, elapsed, correct, remaining = GUESS_HEADER.unpack_from(data, offset)
+                strings, offset = unpack_strings(data, offset + GUESS_HEADER.size, 3)
+                yield GuessEvent(guessed, elapsed, correct, remaining, *strings)
+            else:
+                raise ValueError(f"Unknown record kind {data[offset]} at offset {offset} in {path}")
+    except struct.error:
+        return
+
+class RotatingFile:
+    """
+    An append only file which is rotated once it reaches max_bytes.
+
+    Attributes:
+        path (str): The location of the live file.
+        max_bytes (int): The size at which the file is rotated, or 0 to never rotate.
+        backups (int): The number of rotated segments to keep.
+        compress (bool): Whether rotated segments are gzip compressed.
+    """
+    def __init__(self, path, max_bytes = 10*1024*1024, backups = 5, compress = True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.file = None
+
+    def write(self, data):
+        if self.file is None:
+            self.file = open(self.path, 'ab')
+        if self.max_bytes and self.file.tell() and self.file.tell() + len(data) > self.max_bytes:
+            self.rotate()
+            self.file = open(self.path, 'ab')
+        self.file.write(data)
+        self.file.flush()
+
+    def get_segment(self, idx):
+        """Returns the path of an existing rotated segment, or None."""
+        for path in (f"{self.path}.{idx}.gz", f"{self.path}.{idx}"):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def rotate(self):
+        """Shifts every rotated segment up by one and moves the live file to segment 1."""
+        self.close()
+        oldest = self.get_segment(self.backups)
+        if oldest is not None:
+            os.remove(oldest)
+        for idx in reversed(range(1, self.backups)):
+            segment = self.get_segment(idx)
+            if segment is not None:
+                os.replace(segment, f"{self.path}.{idx+1}" + ('.gz' if segment.endswith('.gz') else ''))
+        if not self.backups:
+            os.remove(self.path)
+            return
+        first = f"{self.path}.1"
+        os.replace(self.path, first)
+        if self.compress:
+            with open(first, 'rb') as src, gzip.open(f"{first}.gz.tmp", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{first}.gz.tmp", f"{first}.gz")
+            os.remove(first)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class EventLog:
+    """
+    Buffers game events and writes them to the text log and, optionally, a binary
+    log with per guess timings.
+
+    Attributes:
+        path (str): The text log of game results.
+        binary_path (str): The binary log of results and guesses, or None to skip guesses.
+        buffer_size (int): The number of buffered bytes which triggers a write.
+        flush_interval (float): The longest time in seconds an event waits to be written.
+    """
+    def __init__(self, path = LOG_FILE, binary_path = None, buffer_size = 64*1024,
+                 flush_interval = 1.0, max_bytes = 10*1024*1024, backups = 5, compress = True):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.files = {'text': RotatingFile(path, max_bytes, backups, compress)}
+        if binary_path is not None:
+            self.files['binary'] = RotatingFile(binary_path, max_bytes, backups, compress)
+        self.buffers = {name: [] for name in self.files}
+        self.buffered = 0
+        self.timer = None
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def log_result(self, player, score, target_word, difficulty):
+        won = int(score>0)
+        now = time.time()
+        word = target_word.replace(' ', '_') # keeps phrases to a single field
+        events = {'text': f"{player} {word} {won} {difficulty}\n".encode('utf-8')}
+        if 'binary' in self.files:
+            events['binary'] = (RESULT_HEADER.pack(RESULT, now, score, won, difficulty)
+                                + pack_strings(player, target_word))
+        self.append(events)
+
+    def log_guess(self, player, target_word, guess, correct, remaining_guesses, elapsed):
+        """Records a single guess and the seconds the player took to make it, if there is a binary log."""
+        if 'binary' in self.files:
+            self.append({'binary': GUESS_HEADER.pack(GUESS, time.time(), elapsed, int(correct), remaining_guesses)
+                                   + pack_strings(player, target_word, guess)})
+
+    def append(self, events):
+        with self.lock:
+            for name, data in events.items():
+                self.buffers[name].append(data)
+                self.buffered += len(data)
+            if self.buffered >= self.buffer_size:
+                self.write()
+            elif self.timer is None and self.flush_interval is not None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Writes every buffered event."""
+        with self.lock:
+            self.write()
+
+    def write(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for name, buffer in self.buffers.items():
+            if buffer:
+                self.files[name].write(b''.join(buffer))
+                buffer.clear()
+        self.buffered = 0
+
+    def close(self):
+        with self.lock:
+            self.write()
+            for rotating_file in self.files.values():
+                rotating_file.close()
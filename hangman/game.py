@@ -1,7 +1,21 @@
-from collections import defaultdict
-import requests
 import json
+import os
 import random
+from .engine import GameState
+from .phrases import get_phrase_source
+from .words import get_default_source
+
+LENGTH_MAP = {'Short':(2,5),
+              'Medium':(5,8),
+              'Long':(8,11),
+              'Random':(2,11)}
+PHRASE = 'Phrase' # a word length option which plays a multi-word phrase from the phrase corpus
+DIFFICULTY_MAP = {'Easy':[1,2,3],
+                  'Medium':[4,5,6,7],
+                  'Hard':[8,9,10],
+                  'Random':list(range(1,11))}
+DIFFICULTY_FILE = 'difficulty.json'
+_difficulty_table_loaded = False
 
 class HangmanGame:
     """
@@ -10,84 +24,79 @@ class HangmanGame:
     Attributes:
         word_length (int or str): The length of the target word.
         difficulty (int or str): The difficulty level of the target word.
+        word_source (WordSource): Supplies the target words. Defaults to the offline
+                                  word list if one exists, otherwise the words API.
+        seen (SeenWords): The words the player has already seen, which new target
+                          words avoid. None to allow repeats.
     """
-    def __init__(self, word_length = 'Random', difficulty = 'Random'):
+    def __init__(self, word_length = 'Random', difficulty = 'Random', word_source = None, seen = None):
         self.word_length = word_length
         self.difficulty = difficulty
-        self.status = 0 # 0 = in progress, 1 = win, -1 = lose
-        self.get_counts()
+        if word_source is not None:
+            self.word_source = word_source
+        elif not hasattr(self, "word_source"):
+            self.word_source = get_default_source()
+        if seen is not None or not hasattr(self, "seen"):
+            self.seen = seen
         self.get_target_word()
-        self.remaining_guesses = 6
-        self.build_letter_dict()
-        self.word = list("_"*len(self.target_word))
+        self.state = GameState(self.target_word, self.current_difficulty)
     
-    def get_counts(self):
+    @classmethod
+    def from_state(cls, state, word_length = 'Random', difficulty = 'Random', word_source = None):
         """
-        Builds a 2d matrix containing the total number of available words for each
-        combination of difficulty and word length. This allows the program to only
-        request a single word from the API each time a new game is started.
+        Resumes a game from an existing GameState without requesting a word. The
+        word source is only needed once a new game is started.
         """
-        if not hasattr(self, "counts"):
-            try: 
-                with open('counts.json','rb') as f:
-                    self.counts = json.load(f)
-            except:
-                self.counts = [[0 for _ in range(11)] for _ in range(11)]
-                for dif in range(1,11):
-                    for length in range(2, 11):
-                        params = {'minLength':length,
-                                'maxLength':length+1,
-                                'difficulty':dif}
-                        response = requests.get('http://app.linkedin-reach.io/words',
-                                             params=params).text
-                        if response: 
-                            self.counts[dif][length] = len(response.split('\n'))
-                with open('counts.json','w') as f:
-                    json.dump(self.counts, f)
-                    
+        game = cls.__new__(cls)
+        game.word_length = word_length
+        game.difficulty = difficulty
+        game.seen = None
+        if word_source is not None:
+            game.word_source = word_source
+        game.current_difficulty = state.difficulty
+        game.target_word = state.target_word
+        game.current_word_length = len(state.target_word)
+        game.state = state
+        return game
+
     def get_word_length_and_difficulty(self):
         """Determines word length and difficulty of target word from player speifications."""
-        if self.word_length == "Random":
-            min_length = 2
-            max_length = 11
-        else:
-            length_map = {'Short':(2,5),
-                          'Medium':(5,8),
-                          'Long':(8,11)}
-            min_length, max_length = length_map[self.word_length]
-        difficulty_map = {'Easy':[1,2,3],
-                          'Medium':[4,5,6,7],
-                          'Hard':[8,9,10]}
-        difficulty_options = difficulty_map[self.difficulty] if self.difficulty != "Random" else list(range(1,11))
-        difficulty = random.choice(difficulty_options)
+        min_length, max_length = (0, 1) if self.word_length == PHRASE else LENGTH_MAP[self.word_length]
+        difficulty = random.choice(get_difficulty_map()[self.difficulty])
         return min_length, max_length, difficulty
                     
     def get_target_word(self):
         """
-        Requests a single word from the API passing the specified difficulty
-        and word length as parameters.
+        Requests a single word from the word source passing the specified difficulty
+        and word length as parameters. Phrases come from the phrase corpus instead.
         """
         min_length, max_length, difficulty = self.get_word_length_and_difficulty()
         self.current_difficulty = difficulty
-        num_available = sum([self.counts[difficulty][length] for length in range(min_length,max_length)])
-        start = random.randint(0,num_available-1)
-        params = {'minLength':min_length,
-                  'maxLength':max_length,
-                  'difficulty':difficulty,
-                  'start':start,
-                  'count':1}
-        self.target_word = requests.get('http://app.linkedin-reach.io/words',
-                             params=params).text
+        source = get_phrase_source() if self.word_length == PHRASE else self.word_source
+        if self.seen is None:
+            self.target_word = source.get_word(min_length, max_length, difficulty)
+        else:
+            self.target_word = source.get_word(min_length, max_length, difficulty, self.seen)
         self.current_word_length = len(self.target_word)
         
-    def build_letter_dict(self):
-        """
-        Builds a dictionary mapping the letters of the target word to a list 
-        of all indices where that letter exists in target word.
-        """
-        self.letters = defaultdict(list)
-        for idx, letter in enumerate(self.target_word):
-            self.letters[letter.lower()].append(idx)
+    @property
+    def status(self):
+        """0 = in progress, 1 = win, -1 = lose"""
+        return self.state.status
+
+    @property
+    def remaining_guesses(self):
+        return self.state.remaining_guesses
+
+    @property
+    def word(self):
+        """The target word as a list of characters with unrevealed letters shown as underscores."""
+        return self.state.get_pattern()
+
+    @property
+    def display(self):
+        """The pattern as shown to the player, with a space between characters."""
+        return self.state.get_display()
             
     def guess(self, guess):
         """
@@ -99,39 +108,34 @@ class HangmanGame:
         player has won or lost the game.
         
         Parameters:
-            guess: The letter of word that was guessed by the player.
+            guess (str): The letter of word that was guessed by the player.
             
         Returns:
             correct_guess (bool): Indicates whether or not the guess was correct.
         """
-        correct_guess = False
-        guess = guess.description if guess.description else guess.value
-        if len(guess) == 1:
-            if guess in self.letters:
-                for idx in self.letters[guess]:
-                    self.word[idx] = guess
-                del self.letters[guess]
-                correct_guess = True
-            else:
-                self.remaining_guesses -= 1
-                if self.remaining_guesses == 0:
-                    self.status = -1
-            if not self.letters:
-                self.status = 1
-        if len(guess) == len(self.target_word):
-            if guess == self.target_word:
-                self.status=1
-                self.correct_guess = True
-            else:
-                self.remaining_guesses -= 1
-                if self.remaining_guesses == 0:
-                    self.status = -1
-        return correct_guess
+        return self.state.guess(guess)
     
     def calculate_score(self):
         """Arbitrary method for calculating the score achieved in a completed game."""
-        if self.status == 1:
-            score = self.current_difficulty * self.current_word_length * self.remaining_guesses
-        else:
-            score = 0
-        return score
+        return self.state.calculate_score()
+
+def load_difficulty_table(path = DIFFICULTY_FILE):
+    """
+    Replaces the difficulties in each level of DIFFICULTY_MAP with the levels of a
+    rescored difficulty table written by hangman.analytics, and returns the table.
+    """
+    with open(path) as f:
+        table = json.load(f)
+    for level, difficulties in table.get('levels', {}).items():
+        if level in DIFFICULTY_MAP and difficulties:
+            DIFFICULTY_MAP[level] = difficulties
+    return table
+
+def get_difficulty_map():
+    """Returns DIFFICULTY_MAP, first loading the rescored levels if a difficulty table exists."""
+    global _difficulty_table_loaded
+    if not _difficulty_table_loaded:
+        _difficulty_table_loaded = True
+        if os.path.exists(DIFFICULTY_FILE):
+            load_difficulty_table()
+    return DIFFICULTY_MAP
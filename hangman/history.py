@@ -1,62 +1,247 @@
-import pandas as pd
-from ipywidgets import widgets
+import json
+import os
+import threading
+import time
+from .eventlog import EventLog
+from .leaderboard import Leaderboard, WindowedLeaderboard
+from .seen import SeenIndex
+
+HISTORY_FILE = 'history.json'
+COLUMNS = ['Player','Games Played','Games Won','Total Score']
+WINDOWS = {'day': 24*60*60, 'week': 7*24*60*60}
 
 class History:
-    """Provides functionality for saving stats visualizing leaderboard."""
-    def __init__(self):
+    """
+    Provides functionality for saving stats visualizing leaderboard.
+
+    Player totals are kept in a dictionary indexed by player name. Each completed
+    game is appended to a log file, and the totals are periodically compacted into
+    a snapshot, written in a background thread, so the log stays short. A
+    leaderboard of total scores, along with leaderboards for the last day and
+    week, is updated as each game is added.
+
+    Attributes:
+        path (str): The snapshot file containing the totals for every player.
+        compact_every (int): The number of logged games between snapshots, or the number
+                             of players if that is larger.
+        event_log (EventLog): The buffered writer for logs.txt. Created on first use if not given.
+    """
+    def __init__(self, path = HISTORY_FILE, compact_every = 1000, event_log = None):
+        self.path = path
+        self.compact_every = compact_every
+        if event_log is not None:
+            self.event_log = event_log
         self.load_history()
-        self.get_scoreboard()
-    
+
     def load_history(self):
-        """Loads the history from a saved json file"""
-        if not hasattr(self, "history"):
+        """Loads the totals from the snapshot and replays any games logged since it was taken."""
+        if not hasattr(self, "players"):
+            self.players = {}
+            self.generation = 0
+            self.windows = {name: WindowedLeaderboard(window) for name, window in WINDOWS.items()}
             try:
-                self.history = pd.read_json('history.json')
-            except:
-                self.history = pd.DataFrame(columns=['Player','Games Played','Games Won','Total Score'])
-                
+                with open(self.path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                snapshot = {}
+            if 'Player' in snapshot: # written by pandas before the log existed
+                for idx, player in snapshot['Player'].items():
+                    self.players[player] = [snapshot[column][idx] for column in COLUMNS[1:]]
+            else:
+                self.generation = snapshot.get('generation', 0)
+                self.players = snapshot.get('players', {})
+                for name, buckets in snapshot.get('windows', {}).items():
+                    self.windows[name].load_json(buckets)
+            self.leaderboard = Leaderboard()
+            for player, stats in self.players.items():
+                self.leaderboard.set(player, stats[2])
+            self.logged = 0
+            self.version = 0
+            generation = self.generation
+            partial_line = False
+            while True: # every log since the snapshot, in case a newer snapshot was never written
+                try:
+                    f = open(self.get_log_path(generation))
+                except OSError:
+                    break
+                partial_line = False
+                with f:
+                    for line in f:
+                        partial_line = not line.endswith('\n')
+                        try:
+                            record = json.loads(line)
+                        except ValueError: # a partially written final line
+                            continue
+                        finished = record[2] if len(record) > 2 else time.time()
+                        self.update_player(record[0], record[1], finished)
+                        self.logged += 1
+                self.generation = generation
+                generation += 1
+            self.partial_line = partial_line # appended to the last log, so the next game must start on a new line
+            self.log_file = None
+            self.compaction = None
+            self.compaction_error = None
+
+    def get_log_path(self, generation = None):
+        generation = self.generation if generation is None else generation
+        return f"{os.path.splitext(self.path)[0]}.{generation}.log"
+
+    def update_player(self, player, score, finished):
+        played, won, total = self.players.get(player, (0, 0, 0))
+        # replaced rather than updated in place, so a shallow copy of players is a consistent snapshot
+        self.players[player] = [played + 1, won + int(score>0), total + score]
+        self.leaderboard.set(player, total + score)
+        for window in self.windows.values():
+            window.add(player, score, finished)
+
     def add_game(self, user, score):
-        """Update the history with the result of a completed game and save results to json file."""
-        if user in self.history.Player.values:
-            idx = self.history[self.history.Player == user].index
-            self.history.loc[idx, 'Games Played'] += 1
-            self.history.loc[idx, 'Games Won'] += int(score>0)
-            self.history.loc[idx, 'Total Score'] += score
-        else:
-            self.history.loc[len(self.history)]=[user, 1, int(score>0), score]
-        self.get_scoreboard()
-        self.history.to_json('history.json')
-        
+        """Update the history with the result of a completed game and append it to the log file."""
+        finished = time.time()
+        self.update_player(user, score, finished)
+        self.version += 1
+        if self.log_file is None:
+            self.log_file = open(self.get_log_path(), 'a')
+            if self.partial_line:
+                self.log_file.write('\n')
+                self.partial_line = False
+        self.log_file.write(json.dumps([user, score, finished]) + '\n')
+        self.log_file.flush()
+        self.logged += 1
+        if self.logged >= max(self.compact_every, len(self.players)): # keeps snapshots O(1) per game
+            self.compact()
+
+    def compact(self):
+        """
+        Starts a new, empty log file and writes a snapshot of the totals in the background.
+
+        The snapshot records the generation of the log that follows it, so games
+        logged before the snapshot are never replayed twice. The previous log is
+        only removed once the snapshot has been written.
+        """
+        self.finish_compaction()
+        players = dict(self.players)
+        windows = {name: window.snapshot() for name, window in self.windows.items()}
+        self.generation += 1
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+        self.logged = 0
+        self.compaction = threading.Thread(target=self.write_snapshot, args=(self.generation, players, windows))
+        self.compaction.start()
+
+    def write_snapshot(self, generation, players, windows):
+        """Writes a snapshot, keeping any error for finish_compaction to raise since it runs in a thread."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f: # dumps encodes in C, unlike dump
+                f.write(json.dumps({'generation': generation, 'players': players, 'windows': windows}))
+            os.replace(tmp_path, self.path)
+            old_log = self.get_log_path(generation - 1)
+            if os.path.exists(old_log):
+                os.remove(old_log)
+        except Exception as e:
+            self.compaction_error = e
+
+    def finish_compaction(self):
+        """
+        Waits for a snapshot being written in the background, and raises the error
+        if writing it failed. The logs it would have replaced are kept, so no games are lost.
+        """
+        if self.compaction is not None:
+            self.compaction.join()
+            self.compaction = None
+        error, self.compaction_error = self.compaction_error, None
+        if error is not None:
+            raise error
+
     def log_game(self, player, score, target_word, difficulty):
         """
-        Log the results of each completed game. 
-        
+        Log the results of each completed game.
+
         Can be used to analyze statistics and possibly rescore the difficulty
-        levels of the words based on player win percentages.
+        levels of the words based on player win percentages. Games are buffered
+        and written in batches by the event log.
         """
-        log = f"{player} {target_word} {int(score>0)} {difficulty}\n"
-        with open('logs.txt', 'a+') as f:
-            f.write(log)
-    
+        self.get_event_log().log_result(player, score, target_word, difficulty)
+
+    def log_guess(self, player, target_word, guess, correct, remaining_guesses, elapsed):
+        """Log a single guess and the seconds taken to make it, if the event log has a binary log."""
+        self.get_event_log().log_guess(player, target_word, guess, correct, remaining_guesses, elapsed)
+
+    def get_seen_words(self, player):
+        """Returns the words a player has already been given, which are saved next to the history."""
+        if not hasattr(self, "seen_index"):
+            self.seen_index = SeenIndex(f"{os.path.splitext(self.path)[0]}.seen.json")
+        return self.seen_index.get(player)
+
+    def get_event_log(self):
+        if not hasattr(self, "event_log"):
+            self.event_log = EventLog()
+        return self.event_log
+
     def display_table(self):
-        display(self.history)
-        
-    def get_scoreboard(self):
+        display(self.get_table())
+
+    def get_rows(self, players = None):
+        """Returns [player, games played, games won, total score] rows for the given players, or every player."""
+        if players is None:
+            players = list(self.players)
+        return [[player] + self.players[player] for player in players]
+
+    def get_table(self, players = None):
+        """Builds a DataFrame with the totals of the given players, or of every player."""
+        import pandas as pd
+        return pd.DataFrame(self.get_rows(players), columns=COLUMNS)
+
+    def get_scoreboard(self, players = None):
         """Generate a scoreboard with statistics for each player"""
-        self.scoreboard = self.history.copy()
-        self.scoreboard['Win Percentage'] = ((self.scoreboard['Games Won']/self.scoreboard['Games Played'])*100)
-        self.scoreboard['Win Percentage'] = [f"{win_percentage:.2f}%" for win_percentage\
-                                             in self.scoreboard['Win Percentage']]
-        
+        scoreboard = self.get_table(players)
+        scoreboard['Win Percentage'] = [get_win_percentage(played, won) for played, won
+                                        in zip(scoreboard['Games Played'], scoreboard['Games Won'])]
+        return scoreboard
+
     def get_player_stats(self, player):
         """Get the historical stats for a particular player"""
-        try:
-            idx = self.scoreboard[self.scoreboard.Player == player].index
-            win_percentage = self.scoreboard.loc[idx, "Win Percentage"] 
-            score = self.scoreboard.loc[idx, "Total Score"] 
-            return win_percentage.values[0], score.values[0]
-        except:
+        if player not in self.players:
             return '0%', 0
-        
-    def display_scoreboard(self):
-        display(self.scoreboard.sort_values(by="Total Score",ascending=False).iloc[:10].style.hide_index())
+        played, won, score = self.players[player]
+        return get_win_percentage(played, won), score
+
+    def get_leaderboard(self, window = None):
+        """Returns the all time leaderboard, or the leaderboard for the 'day' or 'week' window."""
+        return self.leaderboard if window is None else self.windows[window]
+
+    def get_top_players(self, k = 10, window = None):
+        """Returns the names of the k players with the highest total scores."""
+        return [player for player, _ in self.get_leaderboard(window).top(k)]
+
+    def get_player_rank(self, player, window = None):
+        """Returns the rank of a player by total score, or None if the player hasn't played."""
+        return self.get_leaderboard(window).rank(player)
+
+    def get_version(self):
+        """A value which changes whenever a game is added."""
+        return self.version
+
+    def get_leaderboard_snapshot(self, k = 10):
+        """
+        Returns [player, games played, games won, total score, win percentage] rows for
+        the top k players. The rows are cached until the next game is added.
+        """
+        key = (self.get_version(), k)
+        if getattr(self, "snapshot_key", None) != key:
+            self.snapshot = [row + [get_win_percentage(row[1], row[2])]
+                             for row in self.get_rows(self.get_top_players(k))]
+            self.snapshot_key = key
+        return self.snapshot
+
+    def display_scoreboard(self, window = None):
+        if window is None:
+            display(self.get_scoreboard(self.get_top_players(10)).style.hide_index())
+        else:
+            import pandas as pd
+            scores = pd.DataFrame(self.get_leaderboard(window).top(10), columns=['Player', 'Score'])
+            display(scores.style.hide_index())
+
+def get_win_percentage(played, won):
+    return f"{won/played*100:.2f}%"
@@ -1,51 +1,105 @@
-from PIL import Image, ImageDraw, ImageOps
 from io import BytesIO
+import threading
+
+SIZE = 300
+BORDER = 4
+STRUCTURE = [('line', (140,280,280,280), 3),
+             ('line', (225,280,225,40), 3),
+             ('line', (225,40,110,40), 3),
+             ('line', (110,40,110,60), 3)]
+BODY_PARTS = [[('ellipse', (90,60,130,100), 2)],                            # head
+              [('line', (110,100,110,160), 3)],                             # torso
+              [('line', (110,125,140,120), 3)],                             # right arm
+              [('line', (110,125,80,120), 3)],                              # left arm
+              [('line', (110,160,135,195), 3)],                             # right leg
+              [('line', (110,160,85,195), 3), ('text', (98,70), "x  x")]]   # left leg
+WIDGET_FORMATS = {'png': 'png', 'png-indexed': 'png', 'svg': 'svg+xml'}
+
+_frames = {}
+_lock = threading.Lock()
 
 class HangmanImage:
-    """Draws the hangman image one body part at a time following incorrect guesses."""
-    def __init__(self):
-        self.image = Image.new('RGB', (300,300), (255,255,255))
-        self.image = ImageOps.expand(self.image, border=4, fill="black")
-        self.draw = ImageDraw.Draw(self.image)
-        self.draw_structure()
-        self.body_parts = [self.draw_head,
-                           self.draw_torso,
-                           self.draw_right_arm,
-                           self.draw_left_arm,
-                           self.draw_right_leg,
-                           self.draw_left_leg]
+    """
+    Tracks the hangman image shown for the current game, one body part at a time
+    following incorrect guesses.
+
+    Every frame is rendered and encoded once per process and shared between all
+    games, so drawing the next body part only advances an index.
+
+    Attributes:
+        fmt (str): The image format, one of 'png', 'png-indexed' or 'svg'.
+    """
+    def __init__(self, fmt = None):
+        if fmt is not None or not hasattr(self, "fmt"):
+            self.fmt = fmt or 'png'
+        self.widget_format = WIDGET_FORMATS[self.fmt]
         self.idx = 0
-        
-    def draw_structure(self):
-        self.draw.line((140,280,280,280), fill="black", width=3)
-        self.draw.line((225,280,225,40), fill="black", width=3)
-        self.draw.line((225,40,110,40), fill="black", width=3)
-        self.draw.line((110,40,110,60), fill="black", width=3)
-        
+
     def draw_next(self):
-        self.body_parts[self.idx]()
-        self.idx+=1
-        
-    def draw_head(self):
-        self.draw.ellipse((90,60,130,100), outline='black', width=2)
-        
-    def draw_torso(self):
-        self.draw.line((110,100,110,160), fill="black", width=3)
-    
-    def draw_right_arm(self):
-        self.draw.line((110,125,140,120), fill="black", width=3)
-        
-    def draw_left_arm(self):
-        self.draw.line((110,125,80,120), fill="black", width=3)
-    
-    def draw_right_leg(self):
-        self.draw.line((110,160,135,195), fill="black", width=3)
-    
-    def draw_left_leg(self):
-        self.draw.line((110,160,85,195), fill="black", width=3)
-        self.draw.text((98,70),"x  x", fill="black")
-        
+        """Advances to the frame with the next body part drawn."""
+        self.idx = min(self.idx+1, len(BODY_PARTS))
+
     def get_encoded_image(self):
+        return get_frames(self.fmt)[self.idx]
+
+def get_frames(fmt = 'png'):
+    """Returns the encoded frames for 0-6 body parts, rendering them on first use."""
+    if fmt not in _frames:
+        with _lock:
+            if fmt not in _frames:
+                _frames[fmt] = render_svg_frames() if fmt == 'svg' else render_png_frames(fmt == 'png-indexed')
+    return _frames[fmt]
+
+def render_png_frames(indexed = False):
+    """
+    Draws the structure and then each body part in turn, encoding the image after
+    every step. Indexed frames are saved as 1 bit black and white images.
+    """
+    from PIL import Image, ImageDraw, ImageOps
+    image = Image.new('RGB', (SIZE,SIZE), (255,255,255))
+    image = ImageOps.expand(image, border=BORDER, fill="black")
+    draw = ImageDraw.Draw(image)
+    frames = []
+    for shapes in [STRUCTURE] + BODY_PARTS:
+        for shape in shapes:
+            draw_shape(draw, shape)
         b = BytesIO()
-        self.image.save(b, format='png')
-        return b.getvalue()
+        if indexed:
+            image.convert('1', dither=Image.NONE).save(b, format='png', optimize=True)
+        else:
+            image.save(b, format='png')
+        frames.append(b.getvalue())
+    return tuple(frames)
+
+def draw_shape(draw, shape):
+    kind, coords, arg = shape
+    if kind == 'line':
+        draw.line(coords, fill="black", width=arg)
+    elif kind == 'ellipse':
+        draw.ellipse(coords, outline='black', width=arg)
+    else:
+        draw.text(coords, arg, fill="black")
+
+def render_svg_frames():
+    """Builds the frames as SVG documents, which does not require PIL."""
+    size = SIZE + 2*BORDER
+    elements = [f'<rect x="{BORDER/2}" y="{BORDER/2}" width="{size-BORDER}" height="{size-BORDER}" '
+                f'fill="white" stroke="black" stroke-width="{BORDER}"/>']
+    frames = []
+    for shapes in [STRUCTURE] + BODY_PARTS:
+        elements.extend(svg_shape(shape) for shape in shapes)
+        frames.append((f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}">'
+                       + ''.join(elements) + '</svg>').encode())
+    return tuple(frames)
+
+def svg_shape(shape):
+    kind, coords, arg = shape
+    if kind == 'line':
+        x1, y1, x2, y2 = coords
+        return f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="black" stroke-width="{arg}"/>'
+    if kind == 'ellipse':
+        x1, y1, x2, y2 = coords
+        return (f'<ellipse cx="{(x1+x2)/2}" cy="{(y1+y2)/2}" rx="{(x2-x1)/2}" ry="{(y2-y1)/2}" '
+                f'fill="none" stroke="black" stroke-width="{arg}"/>')
+    x, y = coords
+    return f'<text x="{x}" y="{y+10}" font-family="monospace" font-size="11" xml:space="preserve">{arg}</text>'
@@ -0,0 +1,204 @@
+from collections import deque
+import math
+import random
+import time
+
+MAX_LEVELS = 32
+
+class Node:
+    __slots__ = ('value', 'next', 'width')
+
+    def __init__(self, value, height):
+        self.value = value
+        self.next = [None]*height
+        self.width = [1]*height # number of positions to the next node on each level
+
+class SkipList:
+    """
+    A sorted list supporting insertion, removal, rank and positional lookup in
+    logarithmic expected time.
+    """
+    def __init__(self):
+        self.head = Node(None, MAX_LEVELS)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        node = self.head.next[0]
+        while node is not None:
+            yield node.value
+            node = node.next[0]
+
+    def find_chain(self, value):
+        """Returns the last node before value on each level along with its position."""
+        chain = [None]*MAX_LEVELS
+        positions = [0]*MAX_LEVELS
+        node, pos = self.head, 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                pos += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def insert(self, value):
+        chain, positions = self.find_chain(value)
+        height = min(MAX_LEVELS, 1 + int(math.log(1 - random.random(), 0.5)))
+        node = Node(value, height)
+        pos = positions[0] + 1
+        for level in range(height):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = positions[level] + prev.width[level] + 1 - pos
+            prev.width[level] = pos - positions[level]
+        for level in range(height, MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, value):
+        chain, _ = self.find_chain(value)
+        node = chain[0].next[0]
+        if node is None or node.value != value:
+            raise ValueError(f"{value!r} not in list")
+        for level in range(MAX_LEVELS):
+            prev = chain[level]
+            if prev.next[level] is node:
+                prev.width[level] += node.width[level] - 1
+                prev.next[level] = node.next[level]
+            else:
+                prev.width[level] -= 1
+        self.size -= 1
+
+    def index(self, value):
+        """Returns the zero based position of value in the list."""
+        chain, positions = self.find_chain(value)
+        node = chain[0].next[0]
+        if node is None or node.value != value:
+            raise ValueError(f"{value!r} not in list")
+        return positions[0]
+
+    def __getitem__(self, idx):
+        if not 0 <= idx < self.size:
+            raise IndexError("list index out of range")
+        node, pos = self.head, 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and pos + node.width[level] <= idx + 1:
+                pos += node.width[level]
+                node = node.next[level]
+        return node.value
+
+class Leaderboard:
+    """
+    Player scores kept in rank order as they are updated, so the top players and
+    the rank of any player can be found without sorting every player.
+    """
+    def __init__(self):
+        self.scores = {}
+        self.ranking = SkipList() # (-score, player) so that the highest score comes first
+
+    def __len__(self):
+        return len(self.scores)
+
+    def set(self, player, score):
+        """Sets the score of a player, adding the player if needed."""
+        if player in self.scores:
+            self.ranking.remove((-self.scores[player], player))
+        self.scores[player] = score
+        self.ranking.insert((-score, player))
+
+    def add(self, player, score):
+        """Adds to the score of a player."""
+        self.set(player, self.scores.get(player, 0) + score)
+
+    def remove(self, player):
+        self.ranking.remove((-self.scores.pop(player), player))
+
+    def top(self, k = 10):
+        """Returns the k highest scoring (player, score) pairs."""
+        top_players = []
+        for score, player in self.ranking:
+            if len(top_players) == k:
+                break
+            top_players.append((player, -score))
+        return top_players
+
+    def rank(self, player):
+        """Returns the 1 based rank of a player, or None if the player has no score."""
+        if player not in self.scores:
+            return None
+        return self.ranking.index((-self.scores[player], player)) + 1
+
+class WindowedLeaderboard:
+    """
+    A leaderboard which only counts the games played within a sliding time window,
+    such as the last day or week.
+
+    Scores are grouped into time buckets. Buckets which fall out of the window are
+    subtracted from the leaderboard when it is next updated or read, so expiring
+    old games never requires rescanning the history.
+
+    Attributes:
+        window (float): The length of the window in seconds.
+        bucket_size (float): The length of each time bucket in seconds.
+    """
+    def __init__(self, window, bucket_size = None):
+        self.window = window
+        self.bucket_size = bucket_size or window/24
+        self.buckets = deque() # [start, {player: [games, score]}]
+        self.games = {}
+        self.leaderboard = Leaderboard()
+
+    def add(self, player, score, now = None):
+        now = time.time() if now is None else now
+        self.expire(now)
+        start = now - now % self.bucket_size
+        if not self.buckets or self.buckets[-1][0] < start:
+            self.buckets.append([start, {}])
+        players = self.buckets[-1][1]
+        games, total = players.get(player, (0, 0))
+        players[player] = [games + 1, total + score] # replaced, so snapshot only copies the last bucket
+        self.games[player] = self.games.get(player, 0) + 1
+        self.leaderboard.add(player, score)
+
+    def expire(self, now = None):
+        """Removes the scores of every bucket which has fallen out of the window."""
+        now = time.time() if now is None else now
+        while self.buckets and self.buckets[0][0] + self.bucket_size <= now - self.window:
+            _, players = self.buckets.popleft()
+            for player, (games, score) in players.items():
+                self.games[player] -= games
+                if self.games[player] == 0:
+                    del self.games[player]
+                    self.leaderboard.remove(player)
+                else:
+                    self.leaderboard.add(player, -score)
+
+    def top(self, k = 10, now = None):
+        self.expire(now)
+        return self.leaderboard.top(k)
+
+    def rank(self, player, now = None):
+        self.expire(now)
+        return self.leaderboard.rank(player)
+
+    def to_json(self):
+        return [[start, players] for start, players in self.buckets]
+
+    def snapshot(self):
+        """Returns a copy of to_json which later games don't change. Only the newest bucket is still updated."""
+        buckets = self.to_json()
+        if buckets:
+            buckets[-1][1] = dict(buckets[-1][1])
+        return buckets
+
+    def load_json(self, buckets):
+        """Restores buckets saved by to_json."""
+        for start, players in buckets:
+            for player, (games, score) in players.items():
+                self.games[player] = self.games.get(player, 0) + games
+                self.leaderboard.add(player, score)
+            self.buckets.append([start, players])
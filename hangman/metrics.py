@@ -0,0 +1,164 @@
+"""
+Opt-in latency histograms and counters for the game's hot paths.
+
+Instrumentation is installed by wrapping the methods listed in INSTRUMENTED when
+enable() is called and removed again by disable(), so there is no overhead at all
+while it is disabled. Call enable() before creating the App, since widget callbacks
+hold on to the methods that exist when they are registered.
+
+Example:
+    from hangman import metrics
+    metrics.enable()
+    ...
+    print(metrics.registry.to_prometheus())
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import functools
+import importlib
+import json
+import threading
+import time
+
+INSTRUMENTED = [('hangman.game', 'HangmanGame', 'get_target_word'),
+                ('hangman.words', 'HttpWordSource', 'word_at'),
+                ('hangman.game', 'HangmanGame', 'guess'),
+                ('hangman.image', 'HangmanImage', 'get_encoded_image'),
+                ('hangman.app', 'App', 'get_app'),
+                ('hangman.history', 'History', 'add_game'),
+                ('hangman.sqlite_history', 'SQLiteHistory', 'add_game')]
+
+# bucket upper bounds in seconds, growing by 25% from 1 microsecond to about a minute
+BUCKETS = [1e-6 * 1.25**i for i in range(81)]
+
+class Histogram:
+    """Counts observed durations in fixed exponential buckets."""
+    def __init__(self):
+        self.counts = [0]*(len(BUCKETS)+1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q):
+        """Estimates the q-th percentile (0-100) by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q/100 * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[idx-1] if idx > 0 else 0.0
+                upper = BUCKETS[idx] if idx < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+class Registry:
+    """Holds the histograms and counters recorded while instrumentation is enabled."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+
+    def observe(self, name, value):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(value)
+
+    def inc(self, name, value = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, name):
+        """Records the duration of a block of code in the named histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Returns the count, mean and p50/p95/p99 latency of every histogram, along with the counters."""
+        with self.lock:
+            return {'histograms': {name: {'count': hist.count,
+                                          'mean': hist.sum/hist.count if hist.count else 0.0,
+                                          'p50': hist.percentile(50),
+                                          'p95': hist.percentile(95),
+                                          'p99': hist.percentile(99)}
+                                   for name, hist in self.histograms.items()},
+                    'counters': dict(self.counters)}
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self):
+        """Formats the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, hist in sorted(self.histograms.items()):
+                metric = f"hangman_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS, hist.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound:.9g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {hist.count}')
+                lines.append(f"{metric}_sum {hist.sum:.9g}")
+                lines.append(f"{metric}_count {hist.count}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE hangman_{name}_total counter")
+                lines.append(f"hangman_{name}_total {value}")
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+_originals = {}
+
+def instrument(name, method):
+    """Wraps a method so each call is timed and each exception is counted."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            registry.inc(f"{name}_errors")
+            raise
+        finally:
+            registry.observe(name, time.perf_counter() - start)
+    return wrapper
+
+def enable(targets = INSTRUMENTED):
+    """
+    Installs timers around the given (module, class, method) targets. Modules
+    which cannot be imported, e.g. the widget app without ipywidgets, are skipped.
+    """
+    for module_name, class_name, method_name in targets:
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except ImportError:
+            continue
+        key = (cls, method_name)
+        if key in _originals or method_name not in vars(cls):
+            continue
+        _originals[key] = vars(cls)[method_name]
+        name = f"{class_name}_{method_name}".lower()
+        setattr(cls, method_name, instrument(name, _originals[key]))
+
+def disable():
+    """Restores every instrumented method, removing all overhead."""
+    for (cls, method_name), method in _originals.items():
+        setattr(cls, method_name, method)
+    _originals.clear()
+
+def is_enabled():
+    return bool(_originals)
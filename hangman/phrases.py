@@ -0,0 +1,52 @@
+import os
+from .words import WordSource, MIN_DIFFICULTY, MAX_DIFFICULTY
+
+PHRASE_LIST = 'phrases.txt'
+BUNDLED_PHRASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'phrases.txt')
+
+class PhraseSource(WordSource):
+    """
+    A source of multi-word phrases for phrase puzzles, loaded from a local corpus.
+
+    Each line of the file contains a phrase followed by its difficulty, e.g.
+    "break a leg 1". Phrases are not grouped by length, so every phrase of a
+    difficulty is kept in a single bucket with length 0.
+
+    Attributes:
+        path (str): The phrase file. Defaults to phrases.txt in the working
+                    directory if it exists, otherwise the phrases bundled with the game.
+    """
+    def __init__(self, path = None):
+        if path is None:
+            path = PHRASE_LIST if os.path.exists(PHRASE_LIST) else BUNDLED_PHRASES
+        self.path = path
+        self.phrases = [[] for _ in range(MAX_DIFFICULTY+1)]
+        with open(path) as f:
+            for line in f:
+                fields = line.rsplit(None, 1)
+                if len(fields) == 2 and fields[1].isdigit():
+                    self.add(fields[0], int(fields[1]))
+
+    def add(self, phrase, difficulty):
+        phrase = ' '.join(phrase.lower().split())
+        if MIN_DIFFICULTY <= difficulty <= MAX_DIFFICULTY and phrase:
+            self.phrases[difficulty].append(phrase)
+
+    def count(self, difficulty, length = 0):
+        return len(self.phrases[difficulty]) if length == 0 else 0
+
+    def word_at(self, difficulty, length, index):
+        return self.phrases[difficulty][index]
+
+    def get_word(self, min_length, max_length, difficulty, seen = None, rng = None):
+        """Chooses a random phrase at the given difficulty, whatever its length."""
+        return super().get_word(0, 1, difficulty, seen, rng)
+
+def get_phrase_source():
+    """Returns the phrase source shared by all games in this process."""
+    global _default_phrase_source
+    if _default_phrase_source is None:
+        _default_phrase_source = PhraseSource()
+    return _default_phrase_source
+
+_default_phrase_source = None
@@ -0,0 +1,191 @@
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import weakref
+from .game import LENGTH_MAP, get_difficulty_map
+from .words import WordSource
+
+class WordPool(WordSource):
+    """
+    Keeps a small queue of ready target words for every word length and difficulty
+    so that starting a new game does not wait on the word source.
+
+    Words are taken from the front of a queue and background workers refill it.
+    When a queue is empty the word is requested from the fallback source if one is
+    given, otherwise from the wrapped source directly.
+
+    Players with seen words get their own prefetched words instead: prefill and each
+    served word choose the player's next unseen index for a request and fetch its
+    word into a cache keyed by (difficulty, length, index). The index is only marked
+    as seen when the word is served. If the word isn't ready yet, a word from the
+    fallback source is served, even though the player may have seen it before.
+
+    Attributes:
+        source (WordSource): The source used to refill the queues.
+        depth (int): The number of words kept ready for each request.
+        workers (int): The number of background refill threads.
+        fallback (WordSource): An optional non-blocking source used when a queue is empty.
+        cache_size (int): The number of words prefetched for players which are kept.
+    """
+    def __init__(self, source, depth = 2, workers = 2, fallback = None, cache_size = 1024):
+        self.source = source
+        self.depth = depth
+        self.fallback = fallback
+        self.cache_size = cache_size
+        self.queues = {}
+        self.words = OrderedDict()
+        self.next_unseen = weakref.WeakKeyDictionary() # SeenWords -> {key: (length, count, index)}
+        self.refilling = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.last_error = None
+
+    def count(self, difficulty, length):
+        return self.source.count(difficulty, length)
+
+    def word_at(self, difficulty, length, index):
+        return self.source.word_at(difficulty, length, index)
+
+    def get_word(self, min_length, max_length, difficulty, seen = None):
+        """
+        Returns a prefetched word if one is ready and schedules the queue to be
+        refilled. Players with seen words are given the unseen word prefetched for them.
+        """
+        if seen is not None:
+            return self.get_unseen(min_length, max_length, difficulty, seen)
+        key = (min_length, max_length, difficulty)
+        try:
+            word = self.queues[key].popleft()
+            self.count_request(hit=True)
+        except (KeyError, IndexError):
+            self.count_request(hit=False)
+            word = self.get_fallback(key) or self.source.get_word(*key)
+        self.refill(key)
+        return word
+
+    def get_unseen(self, min_length, max_length, difficulty, seen):
+        key = (min_length, max_length, difficulty)
+        with self.lock:
+            choice = self.next_unseen.get(seen, {}).pop(key, None)
+        if choice is not None and (self.count(difficulty, choice[0]) != choice[1]
+                                   or seen.is_seen(difficulty, *choice)):
+            choice = None # the word list changed or another game gave the player this word
+        if choice is None:
+            lengths = range(min_length, max_length)
+            counts = [self.count(difficulty, length) for length in lengths]
+            if not sum(counts):
+                raise ValueError(f"No words available for difficulty {difficulty} "
+                                 f"and lengths {min_length}-{max_length-1}")
+            choice = self.choose_unseen(lengths, counts, difficulty, seen)
+        length, num_words, idx = choice
+        with self.lock:
+            word = self.words.pop((difficulty, length, idx), None)
+        self.count_request(hit=word is not None)
+        if word is None:
+            word = self.get_fallback(key) # may repeat a word, but never waits on the source
+            if word is None:
+                word = self.source.word_at(difficulty, length, idx)
+                seen.mark(difficulty, length, num_words, idx)
+        else:
+            seen.mark(difficulty, length, num_words, idx)
+        self.prefetch(key, seen)
+        return word
+
+    def count_request(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_fallback(self, key):
+        """Returns a word from the fallback source, or None if there is no fallback or it has no word."""
+        if self.fallback is None:
+            return None
+        try:
+            return self.fallback.get_word(*key)
+        except Exception:
+            return None
+
+    def prefetch(self, key, seen):
+        """Starts a background task to fetch the next unseen word for a player unless one is ready."""
+        with self.lock:
+            pending = self.next_unseen.setdefault(seen, {})
+            if key in pending:
+                return
+            pending[key] = None
+        self.executor.submit(self.fetch_unseen, key, seen)
+
+    def fetch_unseen(self, key, seen):
+        min_length, max_length, difficulty = key
+        lengths = range(min_length, max_length)
+        try:
+            counts = [self.source.count(difficulty, length) for length in lengths]
+            if not sum(counts):
+                raise ValueError(f"No words available for difficulty {difficulty}")
+            length, num_words, idx = choice = self.choose_unseen(lengths, counts, difficulty, seen)
+            word = self.source.word_at(difficulty, length, idx)
+        except Exception as e:
+            with self.lock:
+                self.next_unseen.get(seen, {}).pop(key, None)
+            self.record_failure(e)
+            return
+        with self.lock:
+            self.words[(difficulty, length, idx)] = word
+            while len(self.words) > self.cache_size:
+                self.words.popitem(last=False)
+            self.next_unseen.setdefault(seen, {})[key] = choice
+
+    def refill(self, key):
+        """Starts a background task to top up a queue unless one is already running."""
+        with self.lock:
+            if key in self.refilling:
+                return
+            self.refilling.add(key)
+            queue = self.queues.setdefault(key, deque())
+        self.executor.submit(self.fill_queue, key, queue)
+
+    def fill_queue(self, key, queue):
+        try:
+            while len(queue) < self.depth:
+                queue.append(self.source.get_word(*key))
+        except Exception as e: # the next get_word falls back to a direct request
+            self.record_failure(e)
+        finally:
+            with self.lock:
+                self.refilling.discard(key)
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = repr(error)
+
+    def prefill(self, word_length = 'Random', difficulty = 'Random', seen = None):
+        """
+        Fills the queues for every request a game with the given settings can make,
+        or prefetches the next words of a player with seen words.
+        """
+        if word_length not in LENGTH_MAP: # phrases come from the local corpus
+            return
+        min_length, max_length = LENGTH_MAP[word_length]
+        for dif in get_difficulty_map()[difficulty]:
+            if seen is not None:
+                self.prefetch((min_length, max_length, dif), seen)
+            else:
+                self.refill((min_length, max_length, dif))
+
+    def prefill_all(self):
+        """Fills the queues for every combination of word length and difficulty settings."""
+        for word_length in LENGTH_MAP:
+            self.prefill(word_length)
+
+    def stats(self):
+        """Returns the hit, miss and failed refill counters, the last refill error and the number of words ready."""
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'ready': sum(len(queue) for queue in self.queues.values()) + len(self.words)}
@@ -0,0 +1,172 @@
+"""
+Tracks the words each player has already been given, so new games avoid repeats
+without requesting extra words.
+
+For every (difficulty, length) bucket a player has drawn from, a bitset marks the
+word indices already used. A new word is chosen uniformly from the unseen indices
+in a single step, by counting the unseen words in each bucket and then selecting
+the n-th clear bit. Once every word in a range has been seen, those buckets are
+cleared and start again. Each bucket takes one bit per word, so memory stays
+bounded by the size of the word list.
+"""
+import atexit
+import json
+import os
+import threading
+
+BLOCK_SIZE = 64 # bytes counted at once when selecting an unseen index
+BIT_COUNTS = bytes(bin(byte).count('1') for byte in range(256))
+
+def popcount(data):
+    return bin(int.from_bytes(data, 'little')).count('1')
+
+class SeenWords:
+    """
+    The word indices one player has seen in each (difficulty, length) bucket.
+
+    Attributes:
+        buckets (dict): Maps (difficulty, length) to [count, bitset, num_seen], where
+                        count is the size of the bucket when the bitset was created.
+        index (SeenIndex): The index which saves these words, or None.
+    """
+    def __init__(self, buckets = None, index = None):
+        self.buckets = buckets or {}
+        self.index = index
+        self.lock = index.lock if index is not None else threading.RLock()
+
+    def get_bucket(self, difficulty, length, count):
+        bucket = self.buckets.get((difficulty, length))
+        if bucket is None or bucket[0] != count: # new, or the word list has changed
+            bucket = self.buckets[(difficulty, length)] = [count, bytearray((count+7)//8), 0]
+        return bucket
+
+    def unseen(self, difficulty, length, count):
+        """Returns the number of words in a bucket which haven't been seen."""
+        with self.lock:
+            bucket = self.get_bucket(difficulty, length, count)
+            return count - bucket[2]
+
+    def reset(self, difficulty, length):
+        with self.lock:
+            self.buckets.pop((difficulty, length), None)
+
+    def find(self, difficulty, length, count, rank):
+        """Returns the index of the rank-th (zero based) unseen word in a bucket, without marking it."""
+        with self.lock:
+            bits = self.get_bucket(difficulty, length, count)[1]
+            start = 0
+            while True: # skip whole blocks which hold fewer unseen words than rank
+                if start >= len(bits):
+                    raise IndexError(f"rank {rank} is past the last unseen word")
+                end = min(start + BLOCK_SIZE, len(bits))
+                unseen = min(count, end*8) - start*8 - popcount(bits[start:end])
+                if rank < unseen:
+                    break
+                rank -= unseen
+                start = end
+            for pos in range(start, end):
+                unseen = min(8, count - pos*8) - BIT_COUNTS[bits[pos]]
+                if rank < unseen:
+                    break
+                rank -= unseen
+            for bit in range(8):
+                if not bits[pos] >> bit & 1:
+                    if rank == 0:
+                        break
+                    rank -= 1
+            return pos*8 + bit
+
+    def is_seen(self, difficulty, length, count, idx):
+        with self.lock:
+            return bool(self.get_bucket(difficulty, length, count)[1][idx >> 3] >> (idx & 7) & 1)
+
+    def mark(self, difficulty, length, count, idx):
+        """Marks the word at idx in a bucket as seen."""
+        with self.lock:
+            bucket = self.get_bucket(difficulty, length, count)
+            if bucket[1][idx >> 3] >> (idx & 7) & 1:
+                return
+            bucket[1][idx >> 3] |= 1 << (idx & 7)
+            bucket[2] += 1
+        if self.index is not None:
+            self.index.changed()
+
+    def select(self, difficulty, length, count, rank):
+        """Marks and returns the index of the rank-th (zero based) unseen word in a bucket."""
+        with self.lock:
+            idx = self.find(difficulty, length, count, rank)
+            self.mark(difficulty, length, count, idx)
+        return idx
+
+    def merge(self, buckets):
+        """Adds the words seen in other buckets of the same player, such as those saved by another process."""
+        with self.lock:
+            for key, (count, bits, _) in buckets.items():
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    self.buckets[key] = [count, bytearray(bits), popcount(bits)]
+                elif bucket[0] == count: # buckets from a different word list are dropped
+                    merged = int.from_bytes(bucket[1], 'little') | int.from_bytes(bits, 'little')
+                    bucket[1] = bytearray(merged.to_bytes(len(bucket[1]), 'little'))
+                    bucket[2] = popcount(bucket[1])
+
+    def to_json(self):
+        with self.lock:
+            return {f"{difficulty},{length}": [count, bits.hex(), num_seen]
+                    for (difficulty, length), (count, bits, num_seen) in self.buckets.items()}
+
+    @classmethod
+    def from_json(cls, data, index = None):
+        buckets = {}
+        for key, (count, bits, num_seen) in data.items():
+            difficulty, length = map(int, key.split(','))
+            buckets[(difficulty, length)] = [count, bytearray.fromhex(bits), num_seen]
+        return cls(buckets, index)
+
+class SeenIndex:
+    """
+    The seen words of every player, saved to a json file after every save_every
+    changes and at exit.
+
+    Attributes:
+        path (str): The file the seen words are saved to.
+        save_every (int): The number of words drawn between saves.
+    """
+    def __init__(self, path, save_every = 100):
+        self.path = path
+        self.save_every = save_every
+        self.lock = threading.RLock()
+        self.players = {}
+        self.num_changes = 0
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        for player, buckets in data.items():
+            self.players[player] = SeenWords.from_json(buckets, self)
+        atexit.register(self.save)
+
+    def get(self, player):
+        with self.lock:
+            if player not in self.players:
+                self.players[player] = SeenWords(index=self)
+            return self.players[player]
+
+    def changed(self):
+        with self.lock:
+            self.num_changes += 1
+            if self.num_changes < self.save_every:
+                return
+        self.save() # called once the lock is released, so other players never wait on the write
+
+    def save(self):
+        with self.lock:
+            if not self.num_changes:
+                return
+            data = {player: seen.to_json() for player, seen in self.players.items()}
+            self.num_changes = 0
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
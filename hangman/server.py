@@ -0,0 +1,364 @@
+"""
+Hosts many concurrent Hangman games in a single process behind a JSON HTTP API,
+along with a small browser front end.
+
+Usage:
+    python -m hangman.server --port 8000
+
+Endpoints:
+    GET  /                         The browser front end.
+    POST /games                    Starts a session. Body: {"player", "word_length", "difficulty"}
+    GET  /games/<id>               Returns the state of a session.
+    POST /games/<id>/guess         Guesses a letter or word. Body: {"guess"}
+    POST /games/<id>/reset         Starts a new game. Body: {"word_length", "difficulty"} (optional)
+    GET  /image/<n>.svg            The hangman image with n body parts drawn.
+    GET  /scoreboard               The top 10 players. Query: ?window=day|week (optional)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import time
+from .game import HangmanGame, LENGTH_MAP, DIFFICULTY_MAP, PHRASE
+from .image import get_frames
+from .pool import WordPool
+from .snapshot import pack_game, load_snapshots, save_snapshots
+from .words import HttpWordSource, get_default_source
+
+STATUS_TEXT = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+class NoWordAvailable(Exception):
+    """Raised when a game can't be started because the word source failed."""
+
+class Session:
+    """The state of one player's game, kept as small as possible."""
+    __slots__ = ('player', 'game', 'frame', 'guessed_words', 'last_seen', 'turn_started')
+
+    def __init__(self, player, game):
+        self.player = player
+        self.game = game
+        self.frame = 0
+        self.guessed_words = []
+        self.last_seen = self.turn_started = time.monotonic()
+
+    def to_json(self):
+        game = self.game
+        return {'player': self.player,
+                'word': game.display if game.status == 0 else game.target_word,
+                'status': game.status,
+                'remaining_guesses': game.remaining_guesses,
+                'guessed_letters': [chr(97+idx) for idx in range(26) if game.state.guessed >> idx & 1],
+                'guessed_words': self.guessed_words,
+                'image': f"/image/{self.frame}.svg",
+                'word_length': game.word_length,
+                'difficulty': game.difficulty}
+
+class GameServer:
+    """
+    Serves games to many players from one asyncio event loop.
+
+    Choosing a target word and recording results may block, so they run in
+    worker threads. Sessions which have not been used for idle_timeout seconds
+    are evicted. If sessions_path is given, sessions are restored from it on
+    startup and saved to it every checkpoint_interval seconds and at shutdown.
+
+    Attributes:
+        history (History): Records the result of every finished game.
+        word_source (WordSource): Supplies target words. Defaults to the shared source.
+        idle_timeout (float): Seconds of inactivity after which a session is evicted.
+        max_sessions (int): The maximum number of sessions held at once.
+        sessions_path (str): The file which in-progress sessions are saved to, or None.
+        checkpoint_interval (float): Seconds between saves of the sessions.
+    """
+    def __init__(self, history, word_source = None, idle_timeout = 30*60, max_sessions = 100000,
+                 sessions_path = None, checkpoint_interval = 60):
+        self.history = history
+        self.word_source = word_source or get_default_source()
+        if isinstance(self.word_source, HttpWordSource):
+            self.word_source = WordPool(self.word_source, fallback=self.word_source.client.cache)
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.frames = get_frames('svg')
+        self.word_executor = ThreadPoolExecutor(max_workers=8)
+        self.history_executor = ThreadPoolExecutor(max_workers=1) # History is not thread safe
+        self.sessions_path = sessions_path
+        self.checkpoint_interval = checkpoint_interval
+        if sessions_path is not None and os.path.exists(sessions_path):
+            self.load_sessions(sessions_path)
+
+    async def serve(self, host = '127.0.0.1', port = 8000):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        asyncio.ensure_future(self.evict_idle_sessions())
+        if self.sessions_path is not None:
+            asyncio.ensure_future(self.checkpoint_sessions())
+        async with server:
+            await server.serve_forever()
+
+    async def checkpoint_sessions(self):
+        """Periodically saves every session. Packing is done here, and writing in a worker thread."""
+        loop = asyncio.get_event_loop()
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await loop.run_in_executor(self.history_executor, save_snapshots,
+                                       self.sessions_path, self.pack_sessions())
+
+    def pack_sessions(self):
+        return {session_id: pack_game(session.game, session.frame, session.guessed_words, session.player)
+                for session_id, session in self.sessions.items()}
+
+    def save_sessions(self, path = None):
+        """Saves every session in one file, for a restart or to move them to another process."""
+        save_snapshots(path or self.sessions_path, self.pack_sessions())
+
+    def load_sessions(self, path = None):
+        """Restores the sessions saved by save_sessions, keeping their ids."""
+        for session_id, snapshot in load_snapshots(path or self.sessions_path, self.word_source).items():
+            session = Session(snapshot.player, snapshot.game)
+            session.frame = snapshot.frame
+            session.guessed_words = snapshot.guessed_words
+            self.sessions[session_id] = session
+
+    async def evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(min(60, self.idle_timeout))
+            oldest = time.monotonic() - self.idle_timeout
+            for session_id in [key for key, session in self.sessions.items() if session.last_seen < oldest]:
+                del self.sessions[session_id]
+
+    async def handle_connection(self, reader, writer):
+        """Reads requests from a keep-alive connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                    headers = dict(line.split(':', 1) for line in lines[1:] if line)
+                    headers = {key.strip().lower(): value.strip() for key, value in headers.items()}
+                    body = await reader.readexactly(int(headers.get('content-length', 0)))
+                except (ValueError, asyncio.IncompleteReadError):
+                    await self.write_response(writer, 400, {'error': 'Malformed request'}, False)
+                    break
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                status, payload = await self.route(method, target, body)
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def write_response(self, writer, status, payload, keep_alive):
+        if isinstance(payload, tuple):
+            content_type, body, cache = payload
+        else:
+            content_type, body, cache = 'application/json', json.dumps(payload).encode(), 'no-store'
+        writer.write((f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      f"Cache-Control: {cache}\r\n"
+                      f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def route(self, method, target, body):
+        """Dispatches a request to its handler and returns the status code and payload."""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise ValueError("The request body must be a JSON object")
+            if not parts and method == 'GET':
+                return 200, ('text/html; charset=utf-8', INDEX_HTML.encode(), 'no-cache')
+            if parts[0] == 'image' and len(parts) == 2 and method == 'GET':
+                frame = int(parts[1].split('.')[0])
+                if not 0 <= frame < len(self.frames):
+                    return 404, {'error': 'Unknown image'}
+                return 200, ('image/svg+xml', self.frames[frame], 'public, max-age=31536000, immutable')
+            if parts == ['scoreboard'] and method == 'GET':
+                window = parse_qs(url.query).get('window', [None])[0]
+                loop = asyncio.get_event_loop()
+                # reads share the history thread with writes, so they never see a half applied game
+                top = await loop.run_in_executor(self.history_executor,
+                                                 lambda: self.history.get_leaderboard(window).top(10))
+                return 200, [{'player': player, 'score': score} for player, score in top]
+            if parts == ['games'] and method == 'POST':
+                return await self.create_session(data)
+            if parts[0] == 'games' and len(parts) in (2, 3):
+                session = self.sessions.get(parts[1])
+                if session is None:
+                    return 404, {'error': 'Unknown session'}
+                session.last_seen = time.monotonic()
+                if len(parts) == 2 and method == 'GET':
+                    return 200, session.to_json()
+                if parts[2:] == ['guess'] and method == 'POST':
+                    return await self.guess(session, str(data['guess']).lower())
+                if parts[2:] == ['reset'] and method == 'POST':
+                    return await self.reset(session, data)
+        except NoWordAvailable:
+            return 503, {'error': 'No word is available, please try again later'}
+        except (ValueError, KeyError, IndexError, TypeError):
+            return 400, {'error': 'Invalid request'}
+        return 404, {'error': 'Not found'}
+
+    async def new_game(self, word_length, difficulty, player):
+        """Starts a game with a word the player hasn't seen yet."""
+        if (word_length not in LENGTH_MAP and word_length != PHRASE) or difficulty not in DIFFICULTY_MAP:
+            raise ValueError("Unknown word length or difficulty")
+        loop = asyncio.get_event_loop()
+        seen = await loop.run_in_executor(self.history_executor, self.history.get_seen_words, player)
+        try:
+            game = await loop.run_in_executor(self.word_executor, HangmanGame, word_length, difficulty,
+                                              self.word_source, seen)
+        except Exception as e:
+            raise NoWordAvailable(str(e)) from e
+        if isinstance(self.word_source, WordPool):
+            self.word_source.prefill(word_length, difficulty, seen) # the player's next game
+        return game
+
+    async def create_session(self, data):
+        if len(self.sessions) >= self.max_sessions:
+            return 503, {'error': 'Too many sessions'}
+        player = str(data['player']).strip()
+        if not player:
+            raise ValueError("A player name is required")
+        game = await self.new_game(data.get('word_length', 'Random'), data.get('difficulty', 'Random'), player)
+        session_id = secrets.token_urlsafe(12)
+        self.sessions[session_id] = session = Session(player, game)
+        return 201, dict(session.to_json(), id=session_id)
+
+    async def guess(self, session, guess):
+        game = session.game
+        if game.status != 0 or not guess or (len(guess) != 1 and len(guess) != len(game.target_word)):
+            return 400, {'error': 'Invalid guess'}
+        correct = game.guess(guess)
+        if not correct:
+            session.frame = min(session.frame + 1, len(self.frames) - 1)
+        now = time.monotonic()
+        self.history_executor.submit(self.history.log_guess, session.player, game.target_word, guess,
+                                     correct, game.remaining_guesses, now - session.turn_started)
+        session.turn_started = now
+        if len(guess) > 1:
+            session.guessed_words.append(guess)
+        if game.status != 0:
+            loop = asyncio.get_event_loop()
+            score = game.calculate_score()
+            await loop.run_in_executor(self.history_executor, self.record_game, session.player, score,
+                                       game.target_word, game.current_difficulty)
+        return 200, session.to_json()
+
+    def record_game(self, player, score, target_word, difficulty):
+        self.history.add_game(player, score)
+        self.history.log_game(player, score, target_word, difficulty)
+
+    async def reset(self, session, data):
+        game = session.game
+        session.game = await self.new_game(data.get('word_length', game.word_length),
+                                           data.get('difficulty', game.difficulty), session.player)
+        session.frame = 0
+        session.guessed_words = []
+        session.turn_started = time.monotonic()
+        return 200, session.to_json()
+
+INDEX_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Hangman</title>
+<style>
+body{font-family:sans-serif;margin:2em}#letters button{width:2em;margin:1px}
+#word{font-size:2em;letter-spacing:.2em}.win{color:green}.lose{color:red}
+</style></head><body>
+<h1>Welcome To Hangman!</h1>
+<div id="start"><input id="player" placeholder="Enter Your Name"> <button onclick="start()">Start Game</button></div>
+<div id="game" hidden>
+<p>Word Length <select id="length"><option>Short<option>Medium<option>Long<option selected>Random<option>Phrase</select>
+Difficulty <select id="difficulty"><option>Easy<option>Medium<option>Hard<option selected>Random</select>
+<button onclick="reset()">New Game</button> <button onclick="scoreboard()">View Scoreboard</button></p>
+<div id="word"></div><h2 id="remaining"></h2><img id="image" width="308" height="308">
+<div id="letters"></div>
+<p><input id="guess" placeholder="Guess the mystery word"> <button onclick="guessWord()">Guess</button></p>
+<div id="words"></div><pre id="scores"></pre></div>
+<script>
+let id = null;
+async function call(method, path, body) {
+  const response = await fetch(path, {method, headers: {'Content-Type': 'application/json'},
+                                      body: body ? JSON.stringify(body) : undefined});
+  return response.json();
+}
+function render(state) {
+  if (state.error) return;
+  const word = document.getElementById('word');
+  word.textContent = state.word;
+  word.className = {1: 'win', '-1': 'lose'}[state.status] || '';
+  document.getElementById('remaining').textContent =
+    state.status === 1 ? 'You Win!' : state.status === -1 ? 'You Lose' : 'Remaining Guesses: ' + state.remaining_guesses;
+  document.getElementById('image').src = state.image;
+  document.querySelectorAll('#letters button').forEach(button => {
+    button.disabled = state.status !== 0 || state.guessed_letters.includes(button.textContent);
+  });
+  document.getElementById('words').textContent = state.guessed_words.length ? 'Guessed Words: ' + state.guessed_words.join(', ') : '';
+}
+async function start() {
+  const state = await call('POST', '/games', {player: document.getElementById('player').value,
+    word_length: document.getElementById('length').value, difficulty: document.getElementById('difficulty').value});
+  if (state.error) return;
+  id = state.id;
+  document.getElementById('start').hidden = true;
+  document.getElementById('game').hidden = false;
+  render(state);
+}
+async function guess(text) { render(await call('POST', `/games/${id}/guess`, {guess: text})); }
+function guessWord() { const field = document.getElementById('guess'); guess(field.value); field.value = ''; }
+async function reset() {
+  render(await call('POST', `/games/${id}/reset`, {word_length: document.getElementById('length').value,
+                                                   difficulty: document.getElementById('difficulty').value}));
+}
+async function scoreboard() {
+  const scores = document.getElementById('scores');
+  if (scores.textContent) { scores.textContent = ''; return; }
+  scores.textContent = (await call('GET', '/scoreboard')).map((row, idx) => `${idx+1}. ${row.player} ${row.score}`).join('\\n');
+}
+for (const letter of 'abcdefghijklmnopqrstuvwxyz') {
+  const button = document.createElement('button');
+  button.textContent = letter;
+  button.onclick = () => guess(letter);
+  document.getElementById('letters').appendChild(button);
+}
+</script></body></html>
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Hangman games over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--idle-timeout', type=float, default=30*60)
+    parser.add_argument('--history', default='history.json',
+                        help="History snapshot file, or an SQLite database ending in .db")
+    parser.add_argument('--event-log', default=None,
+                        help="Binary log of every result and guess, e.g. logs.bin")
+    parser.add_argument('--sessions', default=None,
+                        help="File which in-progress games are saved to and restored from, e.g. sessions.bin")
+    args = parser.parse_args()
+    if args.history.endswith('.db'):
+        from .sqlite_history import SQLiteHistory
+        history = SQLiteHistory(args.history)
+    else:
+        from .history import History
+        history = History(args.history)
+    if args.event_log is not None:
+        from .eventlog import EventLog
+        history.event_log = EventLog(binary_path=args.event_log)
+    server = GameServer(history, idle_timeout=args.idle_timeout, sessions_path=args.sessions)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    finally:
+        if args.sessions is not None:
+            server.save_sessions()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Plays large numbers of Hangman games between the game engine and automated
+guessing strategies, spread across a process pool.
+
+Games are split into chunks which are each seeded from the base seed and the
+chunk number, so results do not depend on how chunks are scheduled. The
+statistics of every finished chunk are appended to a json lines file as soon
+as they arrive, and only the running totals are kept in memory.
+
+Usage:
+    python -m hangman.simulate words.txt --games 1000000 --strategy frequency
+"""
+from collections import Counter
+from multiprocessing import Pool
+import argparse
+import json
+import math
+import random
+from .engine import GameState, get_letter_masks, LETTERS
+from .game import LENGTH_MAP, DIFFICULTY_MAP, get_difficulty_map
+from .words import WordStore
+
+class RandomStrategy:
+    """Guesses a random letter which has not been guessed yet."""
+    def choose(self, state, candidates, rng):
+        return rng.choice([letter for idx, letter in enumerate(LETTERS) if not state.guessed >> idx & 1])
+
+class FrequencyStrategy:
+    """Guesses the letter which appears in the most remaining candidate words."""
+    def choose(self, state, candidates, rng):
+        best_idx, best_count = None, -1
+        for idx in range(26):
+            if state.guessed >> idx & 1:
+                continue
+            count = sum(1 for masks in candidates if masks[idx])
+            if count > best_count:
+                best_idx, best_count = idx, count
+        return LETTERS[best_idx]
+
+class EntropyStrategy:
+    """
+    Guesses the letter whose outcome splits the remaining candidate words into
+    the most evenly sized groups, maximizing the expected information gained.
+    Letters no candidate contains are only guessed when nothing else is left, and
+    ties, such as when a single candidate remains, go to the most frequent letter.
+    """
+    def choose(self, state, candidates, rng):
+        best_idx, best_score = None, None
+        total = len(candidates)
+        for idx in range(26):
+            if state.guessed >> idx & 1:
+                continue
+            groups = Counter(masks[idx] for masks in candidates)
+            entropy = -sum(n/total * math.log2(n/total) for n in groups.values())
+            count = total - groups[0]
+            score = (count > 0, entropy, count)
+            if best_score is None or score > best_score:
+                best_idx, best_score = idx, score
+        return LETTERS[best_idx]
+
+STRATEGIES = {'random': RandomStrategy,
+              'frequency': FrequencyStrategy,
+              'entropy': EntropyStrategy}
+
+def play_game(target_word, difficulty, strategy, dictionary, rng):
+    """
+    Plays a single game with a strategy which only sees the revealed pattern.
+
+    The candidate words are narrowed after every guess by keeping the words whose
+    positions for the guessed letter match those of the target word.
+    """
+    state = GameState(target_word, difficulty)
+    target_masks = get_letter_masks(target_word)
+    candidates = dictionary[len(target_word)]
+    while state.status == 0:
+        letter = strategy.choose(state, candidates, rng)
+        state.guess(letter)
+        idx = ord(letter) - 97
+        candidates = [masks for masks in candidates if masks[idx] == target_masks[idx]]
+    return state
+
+def init_worker(buckets, strategy):
+    """Builds the per-process word store and candidate dictionary."""
+    global _store, _dictionary, _strategy
+    _store = WordStore(path=None)
+    _store.buckets = buckets
+    _dictionary = {}
+    for row in buckets:
+        for length, words in enumerate(row):
+            _dictionary.setdefault(length, []).extend(get_letter_masks(word) for word in words)
+    _strategy = strategy
+
+def run_chunk(args):
+    """Plays one chunk of games and returns its statistics per difficulty/length bucket."""
+    chunk, num_games, seed, word_length, difficulties = args
+    rng = random.Random(seed * 1000003 + chunk)
+    min_length, max_length = LENGTH_MAP[word_length]
+    stats = {}
+    for _ in range(num_games):
+        dif = rng.choice(difficulties)
+        target_word = _store.get_word(min_length, max_length, dif, rng=rng)
+        state = play_game(target_word, dif, _strategy, _dictionary, rng)
+        bucket = stats.setdefault(f"{dif},{len(target_word)}", new_bucket())
+        bucket['games'] += 1
+        bucket['wins'] += state.status == 1
+        bucket['remaining_guesses'] += state.remaining_guesses
+        score = str(state.calculate_score())
+        bucket['scores'][score] = bucket['scores'].get(score, 0) + 1
+    return chunk, stats
+
+def new_bucket():
+    return {'games': 0, 'wins': 0, 'remaining_guesses': 0, 'scores': {}}
+
+def merge_stats(totals, stats):
+    """Adds the statistics of a chunk to the running totals."""
+    for key, bucket in stats.items():
+        total = totals.setdefault(key, new_bucket())
+        total['games'] += bucket['games']
+        total['wins'] += bucket['wins']
+        total['remaining_guesses'] += bucket['remaining_guesses']
+        for score, count in bucket['scores'].items():
+            total['scores'][score] = total['scores'].get(score, 0) + count
+
+def summarize(totals):
+    """Computes the win rate and mean remaining guesses for each bucket."""
+    return {key: {'games': bucket['games'],
+                  'win_rate': bucket['wins']/bucket['games'],
+                  'mean_remaining_guesses': bucket['remaining_guesses']/bucket['games'],
+                  'scores': dict(sorted(bucket['scores'].items(), key=lambda item: int(item[0])))}
+            for key, bucket in sorted(totals.items())}
+
+def simulate(store, strategy = 'frequency', games = 100000, word_length = 'Random', difficulty = 'Random',
+             chunk_size = 1000, processes = None, seed = 0, output = 'simulation.jsonl'):
+    """
+    Plays games in a process pool and streams the statistics of each chunk to a file.
+
+    Parameters:
+        store (WordStore): The words which target words are chosen from and which
+                           strategies use as their dictionary.
+        strategy (str or object): A name from STRATEGIES or a picklable object with
+                                  a choose(state, candidates, rng) method.
+        games (int): The total number of games to play.
+        word_length (str): The word length setting used to choose target words.
+        difficulty (str): The difficulty setting used to choose target words, using
+                          the levels rescored from the game log if there are any.
+        chunk_size (int): The number of games in each unit of work.
+        processes (int): The number of worker processes. Defaults to the number of cores.
+        seed (int): The base seed from which every chunk is seeded.
+        output (str): The json lines file which receives the statistics of each chunk.
+
+    Returns:
+        dict: The summarized statistics for each "difficulty,length" bucket.
+    """
+    if isinstance(strategy, str):
+        strategy = STRATEGIES[strategy]()
+    difficulties = get_difficulty_map()[difficulty]
+    chunks = [(chunk, min(chunk_size, games - start), seed, word_length, difficulties)
+              for chunk, start in enumerate(range(0, games, chunk_size))]
+    totals = {}
+    with Pool(processes, initializer=init_worker, initargs=(store.buckets, strategy)) as pool, \
+         open(output, 'w') as f:
+        for chunk, stats in pool.imap_unordered(run_chunk, chunks):
+            f.write(json.dumps({'chunk': chunk, 'stats': stats}) + '\n')
+            f.flush()
+            merge_stats(totals, stats)
+    return summarize(totals)
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Hangman games between the engine and guessing strategies.")
+    parser.add_argument('words', help="Word list file with one 'word difficulty' pair per line.")
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='frequency')
+    parser.add_argument('--word-length', choices=list(LENGTH_MAP), default='Random')
+    parser.add_argument('--difficulty', choices=list(DIFFICULTY_MAP), default='Random')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='simulation.jsonl')
+    args = parser.parse_args()
+    summary = simulate(WordStore(args.words), args.strategy, args.games, args.word_length, args.difficulty,
+                       args.chunk_size, args.processes, args.seed, args.output)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compact snapshots of in-progress games, so that games survive a kernel or server
+restart and can be moved between processes.
+
+Each snapshot is a packed little endian record:
+
+    difficulty (B), remaining guesses (B), status (b), image frame (B), guessed letters (I),
+    target word, word length option, difficulty option, player,
+    number of guessed words (B), guessed words
+
+Each string is stored as its utf-8 length (H) followed by its bytes. The revealed
+positions are not stored, since they follow from the guessed letters and status.
+A snapshot is a few dozen bytes and takes microseconds to pack, so a game can be
+checkpointed after every move.
+
+Many snapshots are saved together in one file keyed by session id, starting with
+MAGIC and followed by key, record length (I) and record for each snapshot.
+"""
+from collections import namedtuple
+import os
+import struct
+from .engine import GameState
+from .eventlog import pack_strings, unpack_strings
+from .game import HangmanGame
+
+MAGIC = b'HGS1'
+HEADER = struct.Struct('<BBbBI')
+RECORD_LENGTH = struct.Struct('<I')
+
+Snapshot = namedtuple('Snapshot', ['game', 'frame', 'guessed_words', 'player'])
+
+def pack_game(game, frame = 0, guessed_words = (), player = ''):
+    """Packs a HangmanGame, along with the image frame, guessed words and player, into bytes."""
+    state = game.state
+    guessed_words = list(guessed_words)[-255:]
+    return (HEADER.pack(state.difficulty, state.remaining_guesses, state.status, frame, state.guessed)
+            + pack_strings(state.target_word, str(game.word_length), str(game.difficulty), player or '')
+            + bytes([len(guessed_words)]) + pack_strings(*guessed_words))
+
+def unpack_game(data, offset = 0, word_source = None):
+    """Restores a Snapshot packed by pack_game, returning it along with the offset after the record."""
+    difficulty, remaining_guesses, status, frame, guessed = HEADER.unpack_from(data, offset)
+    (target_word, word_length, level, player), offset = unpack_strings(data, offset + HEADER.size, 4)
+    guessed_words, offset = unpack_strings(data, offset + 1, data[offset])
+    state = GameState.restore(target_word, difficulty, guessed, remaining_guesses, status)
+    game = HangmanGame.from_state(state, word_length, level, word_source)
+    return Snapshot(game, frame, guessed_words, player), offset
+
+def save_snapshots(path, records):
+    """Writes a {key: packed snapshot} mapping to a file atomically."""
+    chunks = [MAGIC]
+    for key, record in records.items():
+        chunks.append(pack_strings(key))
+        chunks.append(RECORD_LENGTH.pack(len(record)))
+        chunks.append(record)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b''.join(chunks))
+    os.replace(tmp_path, path)
+
+def load_snapshots(path, word_source = None):
+    """Reads a file written by save_snapshots into a {key: Snapshot} mapping."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a snapshot file")
+    snapshots = {}
+    offset = len(MAGIC)
+    while offset < len(data):
+        (key,), offset = unpack_strings(data, offset, 1)
+        length, = RECORD_LENGTH.unpack_from(data, offset)
+        offset += RECORD_LENGTH.size
+        snapshots[key], _ = unpack_game(data, offset, word_source)
+        offset += length
+    return snapshots
@@ -0,0 +1,113 @@
+import numpy as np
+from .engine import LETTERS
+
+class Solver:
+    """
+    Suggests the best letter to guess next from the words which still match the
+    revealed pattern.
+
+    The dictionary is stored as one uint8 matrix of letter codes per word length,
+    along with a matrix recording which letters each word contains, so matching
+    and letter counting are array operations.
+
+    Attributes:
+        words (iterable): The dictionary of words the target word is drawn from.
+    """
+    def __init__(self, words):
+        by_length = {}
+        for word in set(word.lower() for word in words):
+            by_length.setdefault(len(word), []).append(word)
+        self.words = {}
+        self.matrices = {}
+        self.presence = {}
+        self.letter_counts = {}
+        for length, group in by_length.items():
+            group.sort()
+            codes = np.frombuffer(''.join(group).encode('latin-1', 'replace'), dtype=np.uint8) - 97
+            matrix = codes.reshape(len(group), length) # characters which aren't letters fall outside 0-25
+            presence = np.zeros((len(group), 27), dtype=bool)
+            presence[np.arange(len(group))[:, None], np.minimum(matrix, 26)] = True
+            self.words[length] = group
+            self.matrices[length] = matrix
+            self.presence[length] = presence[:, :26]
+            self.letter_counts[length] = self.presence[length].sum(axis=0)
+
+    @classmethod
+    def from_store(cls, store):
+        """Builds a solver from every word in a WordStore."""
+        return cls(word for row in store.buckets for bucket in row for word in bucket)
+
+    def start(self, length):
+        """Returns the solver state for a new game with a target word of the given length."""
+        return SolverState(self, length)
+
+class SolverState:
+    """
+    The candidate words for a single game, narrowed incrementally as letters are guessed.
+
+    Attributes:
+        solver (Solver): The solver holding the dictionary.
+        length (int): The length of the target word.
+    """
+    def __init__(self, solver, length):
+        self.solver = solver
+        self.length = length
+        self.candidates = None # None means every word of this length
+        self.guessed = set()
+
+    def update(self, pattern, wrong_letters):
+        """
+        Removes the candidates ruled out by letters guessed since the last update.
+
+        Parameters:
+            pattern: The revealed word as a string or list with underscores for hidden letters.
+            wrong_letters: The letters which have been guessed and are not in the target word.
+        """
+        pattern = [letter.lower() for letter in pattern]
+        new_letters = (set(pattern) - {'_'} | set(wrong_letters)) - self.guessed
+        new_letters &= set(LETTERS)
+        if not new_letters:
+            return
+        matrix = self.solver.matrices.get(self.length, np.zeros((0, self.length), dtype=np.uint8))
+        presence = self.solver.presence.get(self.length, np.zeros((0, 26), dtype=bool))
+        candidates = np.arange(len(matrix)) if self.candidates is None else self.candidates
+        for letter in new_letters:
+            code = ord(letter) - 97
+            if letter in pattern:
+                expected = np.array([char == letter for char in pattern])
+                keep = ((matrix[candidates] == code) == expected).all(axis=1)
+            else:
+                keep = ~presence[candidates, code]
+            candidates = candidates[keep]
+        self.candidates = candidates
+        self.guessed |= new_letters
+
+    def get_candidates(self):
+        """Returns the words which still match every guess."""
+        words = self.solver.words.get(self.length, [])
+        if self.candidates is None:
+            return list(words)
+        return [words[idx] for idx in self.candidates]
+
+    def best_letter(self):
+        """
+        Returns the unguessed letter contained in the most candidate words, or
+        None if no candidate contains an unguessed letter.
+        """
+        if self.candidates is None:
+            counts = self.solver.letter_counts.get(self.length, np.zeros(26, dtype=int)).copy()
+        else:
+            presence = self.solver.presence.get(self.length, np.zeros((0, 26), dtype=bool))
+            counts = presence[self.candidates].sum(axis=0)
+        for letter in self.guessed:
+            counts[ord(letter) - 97] = 0
+        idx = int(counts.argmax())
+        return LETTERS[idx] if counts[idx] > 0 else None
+
+    def hint(self, game):
+        """Updates the candidates from a HangmanGame and returns the best next letter."""
+        pattern = game.word
+        wrong_letters = [letter for idx, letter in enumerate(LETTERS)
+                         if game.state.guessed >> idx & 1 and letter not in pattern]
+        self.update(pattern, wrong_letters)
+        return self.best_letter()
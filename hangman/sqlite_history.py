@@ -0,0 +1,284 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from .history import History, HISTORY_FILE, WINDOWS
+from .seen import SeenIndex, SeenWords
+
+HISTORY_DB = 'history.db'
+
+class SQLiteHistory(History):
+    """
+    A history backend stored in an SQLite database, which lets many game processes
+    record results at the same time without losing updates.
+
+    The database uses write-ahead logging so readers never block writers. Player
+    totals are updated with a single upsert inside the database, so concurrent
+    writers never overwrite each other. Results can be buffered and written in
+    batches of batch_size games per transaction.
+
+    Attributes:
+        path (str): The location of the database file.
+        batch_size (int): The number of games buffered before they are written.
+        timeout (float): Seconds to wait for another writer to release its lock.
+    """
+    def __init__(self, path = HISTORY_DB, batch_size = 1, timeout = 30):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending_games = []
+        self.pending_logs = []
+        self.commits = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS players (
+                player TEXT PRIMARY KEY,
+                games_played INTEGER NOT NULL,
+                games_won INTEGER NOT NULL,
+                total_score INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS players_total_score ON players (total_score);
+            CREATE TABLE IF NOT EXISTS results (
+                player TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                finished REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS results_finished ON results (finished);
+            CREATE TABLE IF NOT EXISTS games (
+                id INTEGER PRIMARY KEY,
+                player TEXT NOT NULL,
+                target_word TEXT NOT NULL,
+                won INTEGER NOT NULL,
+                difficulty INTEGER NOT NULL,
+                finished REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS seen_words (
+                player TEXT PRIMARY KEY,
+                buckets TEXT NOT NULL);
+            """)
+        atexit.register(self.flush)
+
+    def add_game(self, user, score):
+        """Records the result of a completed game, writing it once a full batch is buffered."""
+        with self.lock:
+            self.pending_games.append((user, int(score>0), score, time.time()))
+            full = len(self.pending_games) >= self.batch_size
+        if full:
+            self.flush()
+
+    def log_game(self, player, score, target_word, difficulty):
+        """Records the word and outcome of each completed game in the games table."""
+        with self.lock:
+            self.pending_logs.append((player, target_word, int(score>0), difficulty, time.time()))
+            full = len(self.pending_logs) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every buffered game in a single transaction. The buffers are swapped
+        out first, so games added by other threads meanwhile wait for the next flush,
+        and are put back if the transaction fails.
+        """
+        with self.lock:
+            if not self.pending_games and not self.pending_logs:
+                return
+            games, logs = self.pending_games, self.pending_logs
+            self.pending_games, self.pending_logs = [], []
+            try:
+                with self.transaction():
+                    self.connection.executemany("""
+                        INSERT INTO players VALUES (?, 1, ?, ?)
+                        ON CONFLICT (player) DO UPDATE SET
+                            games_played = games_played + 1,
+                            games_won = games_won + excluded.games_won,
+                            total_score = total_score + excluded.total_score""",
+                        [game[:3] for game in games])
+                    self.connection.executemany("INSERT INTO results VALUES (?, ?, ?)",
+                                                [(user, score, finished) for user, _, score, finished in games])
+                    self.connection.executemany("""
+                        INSERT INTO games (player, target_word, won, difficulty, finished)
+                        VALUES (?, ?, ?, ?, ?)""", logs)
+            except BaseException:
+                self.pending_games[:0] = games
+                self.pending_logs[:0] = logs
+                raise
+            self.commits += 1
+
+    def transaction(self):
+        return Transaction(self.connection)
+
+    def get_version(self):
+        """A value which changes whenever this or any other process adds a game."""
+        self.flush()
+        return self.commits, self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_player_stats(self, player):
+        """Get the historical stats for a particular player"""
+        self.flush()
+        row = self.connection.execute("""
+            SELECT games_played, games_won, total_score FROM players WHERE player = ?""",
+            (player,)).fetchone()
+        if row is None:
+            return '0%', 0
+        return f"{row[1]/row[0]*100:.2f}%", row[2]
+
+    def get_top_players(self, k = 10, window = None):
+        """Returns the names of the k players with the highest total scores."""
+        return [player for player, _ in self.get_top_scores(k, window)]
+
+    def get_top_scores(self, k = 10, window = None):
+        """
+        Returns the k highest scoring (player, score) pairs, either all time or for
+        the games finished within the 'day' or 'week' window.
+        """
+        self.flush()
+        if window is None:
+            return self.connection.execute("""
+                SELECT player, total_score FROM players ORDER BY total_score DESC LIMIT ?""",
+                (k,)).fetchall()
+        return self.connection.execute("""
+            SELECT player, SUM(score) AS score FROM results WHERE finished >= ?
+            GROUP BY player ORDER BY score DESC LIMIT ?""",
+            (time.time() - WINDOWS[window], k)).fetchall()
+
+    def get_player_rank(self, player, window = None):
+        """Returns the rank of a player by total score, or None if the player hasn't played."""
+        self.flush()
+        if window is not None:
+            row = self.connection.execute("""
+                WITH scores AS (
+                    SELECT player, SUM(score) AS score FROM results WHERE finished >= ? GROUP BY player)
+                SELECT (SELECT COUNT(*) FROM scores WHERE score > own.score) + 1
+                FROM scores AS own WHERE player = ?""",
+                (time.time() - WINDOWS[window], player)).fetchone()
+            return row[0] if row is not None else None
+        row = self.connection.execute("SELECT total_score FROM players WHERE player = ?", (player,)).fetchone()
+        if row is None:
+            return None
+        return self.connection.execute("""
+            SELECT COUNT(*) FROM players WHERE total_score > ?""", row).fetchone()[0] + 1
+
+    def get_leaderboard(self, window = None):
+        return SQLiteLeaderboard(self, window)
+
+    def get_seen_words(self, player):
+        """Returns the words a player has already been given, which are shared through the database."""
+        if not hasattr(self, "seen_index"):
+            self.seen_index = SQLiteSeenIndex(self)
+        return self.seen_index.get(player)
+
+    def load_seen_words(self, player):
+        with self.lock:
+            row = self.connection.execute("SELECT buckets FROM seen_words WHERE player = ?", (player,)).fetchone()
+        return SeenWords.from_json(json.loads(row[0])) if row is not None else SeenWords()
+
+    def save_seen_words(self, players):
+        """
+        Merges {player: SeenWords} with the seen words stored by every process and
+        returns the merged SeenWords of each player.
+        """
+        merged = {}
+        with self.lock, self.transaction():
+            for player, seen in players.items():
+                row = self.connection.execute("SELECT buckets FROM seen_words WHERE player = ?",
+                                              (player,)).fetchone()
+                stored = SeenWords.from_json(json.loads(row[0])) if row is not None else SeenWords()
+                stored.merge(seen.buckets)
+                self.connection.execute("INSERT OR REPLACE INTO seen_words VALUES (?, ?)",
+                                        (player, json.dumps(stored.to_json())))
+                merged[player] = stored
+        return merged
+
+    def get_rows(self, players = None):
+        self.flush()
+        rows = self.connection.execute("SELECT * FROM players").fetchall()
+        if players is None:
+            return [list(row) for row in rows]
+        wanted = set(players)
+        by_player = {row[0]: list(row) for row in rows if row[0] in wanted}
+        return [by_player[player] for player in players if player in by_player]
+
+    def import_json(self, path = HISTORY_FILE):
+        """
+        Adds the totals from an existing history.json snapshot, along with any games
+        in its log, to the database.
+        """
+        players = History(path).players
+        with self.lock, self.transaction():
+            self.connection.executemany("""
+                INSERT INTO players VALUES (?, ?, ?, ?)
+                ON CONFLICT (player) DO UPDATE SET
+                    games_played = games_played + excluded.games_played,
+                    games_won = games_won + excluded.games_won,
+                    total_score = total_score + excluded.total_score""",
+                [[player] + stats for player, stats in players.items()])
+        return len(players)
+
+    def import_logs(self, path = 'logs.txt'):
+        """Adds the games recorded in an existing logs.txt file to the games table."""
+        with open(path) as f:
+            rows = []
+            for line in f:
+                fields = line.split()
+                if len(fields) == 4:
+                    rows.append((fields[0], fields[1], int(fields[2]), int(fields[3]), 0))
+        with self.lock, self.transaction():
+            self.connection.executemany("""
+                INSERT INTO games (player, target_word, won, difficulty, finished)
+                VALUES (?, ?, ?, ?, ?)""", rows)
+        return len(rows)
+
+class SQLiteLeaderboard:
+    """Answers leaderboard queries from the database for SQLiteHistory."""
+    def __init__(self, history, window):
+        self.history = history
+        self.window = window
+
+    def top(self, k = 10):
+        return self.history.get_top_scores(k, self.window)
+
+    def rank(self, player):
+        return self.history.get_player_rank(player, self.window)
+
+class SQLiteSeenIndex(SeenIndex):
+    """
+    The seen words of every player, kept in the history database. Each save merges
+    them with the words stored by other processes instead of overwriting them, and
+    the words those processes have given out are merged back in.
+    """
+    def __init__(self, history, save_every = 100):
+        self.history = history
+        self.save_every = save_every
+        self.lock = threading.RLock()
+        self.players = {}
+        self.num_changes = 0
+        atexit.register(self.save)
+
+    def get(self, player):
+        with self.lock:
+            if player not in self.players:
+                seen = self.players[player] = SeenWords(index=self)
+                seen.merge(self.history.load_seen_words(player).buckets)
+            return self.players[player]
+
+    def save(self):
+        with self.lock:
+            if not self.num_changes:
+                return
+            players = {player: SeenWords.from_json(seen.to_json()) for player, seen in self.players.items()}
+            self.num_changes = 0
+        for player, stored in self.history.save_seen_words(players).items():
+            self.players[player].merge(stored.buckets)
+
+class Transaction:
+    """Runs a block of statements in an immediate transaction, rolling back on error."""
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
@@ -0,0 +1,215 @@
+import json
+import os
+import random
+
+WORDS_URL = 'http://app.linkedin-reach.io/words'
+WORD_LIST = 'words.txt'
+COUNTS_MAX_AGE = 24*60*60 # seconds before a bucket of the counts matrix is refreshed
+MIN_DIFFICULTY, MAX_DIFFICULTY = 1, 10
+MIN_LENGTH, MAX_LENGTH = 2, 10
+
+class WordSource:
+    """
+    Base class for the sources that supply target words to the game.
+
+    Words are grouped into buckets by (difficulty, length). Subclasses implement
+    count and word_at, which get_word uses to choose a word uniformly at random
+    from a range of word lengths.
+    """
+    def count(self, difficulty, length):
+        """Returns the number of words available in a single bucket."""
+        raise NotImplementedError
+
+    def word_at(self, difficulty, length, index):
+        """Returns the word stored at a given index within a single bucket."""
+        raise NotImplementedError
+
+    def get_word(self, min_length, max_length, difficulty, seen = None, rng = None):
+        """
+        Chooses a random word with min_length <= length < max_length at the
+        given difficulty. Every word in the range is equally likely.
+
+        If a player's SeenWords are given, the word is chosen from the words the
+        player hasn't seen yet and marked as seen. Once every word in the range
+        has been seen, the range starts again. A random.Random can be given as
+        rng to make the choice repeatable.
+        """
+        lengths = range(min_length, max_length)
+        counts = [self.count(difficulty, length) for length in lengths]
+        total = sum(counts)
+        if not total:
+            raise ValueError(f"No words available for difficulty {difficulty} "
+                             f"and lengths {min_length}-{max_length-1}")
+        if seen is not None:
+            return self.get_unseen_word(lengths, counts, difficulty, seen)
+        idx = (rng or random).randrange(total)
+        for length, num_words in zip(lengths, counts):
+            if idx < num_words:
+                return self.word_at(difficulty, length, idx)
+            idx -= num_words
+
+    def get_unseen_word(self, lengths, counts, difficulty, seen):
+        length, num_words, idx = self.choose_unseen(lengths, counts, difficulty, seen)
+        word = self.word_at(difficulty, length, idx)
+        seen.mark(difficulty, length, num_words, idx) # only once the word has been fetched
+        return word
+
+    def choose_unseen(self, lengths, counts, difficulty, seen):
+        """Returns the length, bucket size and index of a random unseen word, without marking it."""
+        with seen.lock: # other games of the player may mark words between counting and finding
+            unseen = [seen.unseen(difficulty, length, num_words) for length, num_words in zip(lengths, counts)]
+            if not sum(unseen):
+                for length in lengths:
+                    seen.reset(difficulty, length)
+                unseen = counts
+            rank = random.randrange(sum(unseen))
+            for length, num_words, num_unseen in zip(lengths, counts, unseen):
+                if rank < num_unseen:
+                    return length, num_words, seen.find(difficulty, length, num_words, rank)
+                rank -= num_unseen
+
+class WordStore(WordSource):
+    """
+    An offline word source loaded from a word list file.
+
+    Each line of the file contains a word and its difficulty separated by a space,
+    e.g. "hangman 4". Words are indexed into (difficulty, length) buckets so that
+    a random word can be selected without any network access.
+
+    Attributes:
+        path (str): The location of the word list file.
+    """
+    def __init__(self, path = WORD_LIST):
+        self.path = path
+        self.buckets = [[[] for _ in range(MAX_LENGTH+1)] for _ in range(MAX_DIFFICULTY+1)]
+        if path is not None:
+            self.load()
+
+    @classmethod
+    def from_words(cls, words):
+        """Builds a store from an iterable of (word, difficulty) pairs."""
+        store = cls(path=None)
+        for word, difficulty in words:
+            store.add(word, difficulty)
+        return store
+
+    def load(self):
+        """Reads the word list file into the (difficulty, length) buckets."""
+        with open(self.path) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 2 and fields[1].isdigit():
+                    self.add(fields[0], int(fields[1]))
+
+    def add(self, word, difficulty):
+        """Adds a single word to its bucket, ignoring words outside of the supported range."""
+        word = word.lower()
+        if MIN_DIFFICULTY <= difficulty <= MAX_DIFFICULTY and MIN_LENGTH <= len(word) <= MAX_LENGTH:
+            self.buckets[difficulty][len(word)].append(word)
+
+    def rescore(self, difficulties):
+        """Moves words to the difficulty given in a word: difficulty mapping, such as a rescored table."""
+        for difficulty, row in enumerate(self.buckets):
+            for length, bucket in enumerate(row):
+                moved = {word for word in bucket if difficulties.get(word, difficulty) != difficulty}
+                if moved:
+                    row[length] = [word for word in bucket if word not in moved]
+                    for word in moved:
+                        self.add(word, difficulties[word])
+
+    def save(self, path = None):
+        """Writes the store to a word list file which can be loaded later."""
+        with open(path or self.path, 'w') as f:
+            for difficulty in range(MIN_DIFFICULTY, MAX_DIFFICULTY+1):
+                for length in range(MIN_LENGTH, MAX_LENGTH+1):
+                    for word in self.buckets[difficulty][length]:
+                        f.write(f"{word} {difficulty}\n")
+
+    @property
+    def counts(self):
+        """A 2d matrix with the number of words for each difficulty and word length."""
+        return [[len(bucket) for bucket in row] for row in self.buckets]
+
+    def count(self, difficulty, length):
+        return len(self.buckets[difficulty][length])
+
+    def word_at(self, difficulty, length, index):
+        return self.buckets[difficulty][length][index]
+
+class HttpWordSource(WordSource):
+    """
+    A word source which requests each target word from the words API.
+
+    Requests go through a WordClient, which retries failures, stops calling the
+    API while it is down and serves recently fetched words from its cache instead.
+
+    Attributes:
+        url (str): The address of the words endpoint.
+        client (WordClient): The client used for every request. Defaults to one
+                             with a cache in words_cache.db.
+    """
+    def __init__(self, url = WORDS_URL, max_age = None, client = None):
+        from .client import WordClient
+        self.url = url
+        self.client = client or WordClient(url)
+        self.get_counts()
+        if max_age is not None:
+            self.refresh_counts(max_age)
+
+    def get_counts(self):
+        """
+        Builds a 2d matrix containing the total number of available words for each
+        combination of difficulty and word length. This allows the program to only
+        request a single word from the API each time a new game is started.
+        """
+        if not hasattr(self, "counts"):
+            from .counts import CountsBuilder
+            self.counts_builder = CountsBuilder(self.url, client=self.client)
+            try:
+                with open(self.counts_builder.path,'rb') as f:
+                    self.counts = json.load(f)
+            except (OSError, ValueError):
+                self.counts = self.counts_builder.build()
+
+    def refresh_counts(self, max_age):
+        """
+        Rebuilds buckets older than max_age seconds in the background. Games keep
+        using the current matrix until the refreshed one is ready.
+        """
+        def set_counts(counts):
+            self.counts = counts
+        return self.counts_builder.refresh_in_background(max_age, set_counts)
+
+    def count(self, difficulty, length):
+        return self.counts[difficulty][length]
+
+    def word_at(self, difficulty, length, index):
+        return self.client.word_at(difficulty, length, index)
+
+    def export(self, path = WORD_LIST):
+        """Downloads every word from the API into a word list file for offline play."""
+        store = WordStore(path=None)
+        for dif in range(MIN_DIFFICULTY, MAX_DIFFICULTY+1):
+            for length in range(MIN_LENGTH, MAX_LENGTH+1):
+                for word in self.client.get_words(dif, length):
+                    store.add(word, dif)
+        store.save(path)
+        return store
+
+def get_default_source():
+    """
+    Returns the word source shared by all games in this process.
+
+    The offline word list is used whenever it exists, otherwise words are
+    requested from the API, refreshing counts older than COUNTS_MAX_AGE in the
+    background.
+    """
+    global _default_source
+    if _default_source is None:
+        if os.path.exists(WORD_LIST):
+            _default_source = WordStore(WORD_LIST)
+        else:
+            _default_source = HttpWordSource(max_age=COUNTS_MAX_AGE)
+    return _default_source
+
+_default_source = None
@@ -0,0 +1,82 @@
+from hangman.analytics import LogAnalyzer, get_rotated_logs
+from hangman.eventlog import EventLog
+
+def make_log(tmp_path, **kwargs):
+    return EventLog(str(tmp_path / 'logs.txt'), buffer_size=1, flush_interval=None,
+                    max_bytes=200, backups=20, **kwargs)
+
+def log_games(event_log, games):
+    for idx in range(games):
+        word = ['cat', 'dog', 'fish'][idx % 3]
+        event_log.log_result(f"player {idx}", idx % 2, word, 4) # names may contain spaces
+
+def count_games(analyzer):
+    return sum(games for games, _, _ in analyzer.words.values())
+
+def test_reads_each_game_once_across_rotations(tmp_path):
+    event_log = make_log(tmp_path)
+    state_path = str(tmp_path / 'state.json')
+    log_games(event_log, 5)
+    analyzer = LogAnalyzer(str(tmp_path / 'logs.txt'), state_path)
+    analyzer.update()
+    assert count_games(analyzer) == 5
+    log_games(event_log, 40) # rotates several times
+    assert len(get_rotated_logs(str(tmp_path / 'logs.txt'))) > 2
+    assert all(path.endswith('.gz') for path in get_rotated_logs(str(tmp_path / 'logs.txt')))
+    analyzer = LogAnalyzer(str(tmp_path / 'logs.txt'), state_path)
+    analyzer.update()
+    assert count_games(analyzer) == 45
+    analyzer.update()
+    assert count_games(analyzer) == 45
+    assert analyzer.words['cat'] == [16, 8, 4]
+    event_log.close()
+
+def test_rotation_right_after_an_update(tmp_path):
+    event_log = make_log(tmp_path, compress=False)
+    log_path = str(tmp_path / 'logs.txt')
+    analyzer = LogAnalyzer(log_path, str(tmp_path / 'state.json'))
+    while not get_rotated_logs(log_path):
+        log_games(event_log, 1)
+        analyzer.update()
+    log_games(event_log, 1)
+    analyzer.update()
+    total = count_games(analyzer)
+    event_log.files['text'].rotate() # the live file is now empty
+    analyzer.update()
+    log_games(event_log, 3)
+    analyzer.update()
+    assert count_games(analyzer) == total + 3
+    event_log.close()
+
+def test_partial_lines_wait_for_the_rest_of_the_line(tmp_path):
+    log_path = tmp_path / 'logs.txt'
+    log_path.write_text("alice cat 1 2\nbob dog 0 ")
+    analyzer = LogAnalyzer(str(log_path), str(tmp_path / 'state.json'))
+    analyzer.update()
+    assert analyzer.words == {'cat': [1, 1, 2]}
+    with open(log_path, 'a') as f:
+        f.write("7\n")
+    analyzer.update()
+    assert analyzer.words == {'cat': [1, 1, 2], 'dog': [1, 0, 7]}
+
+def test_truncated_log_is_read_from_the_start(tmp_path):
+    log_path = tmp_path / 'logs.txt'
+    log_path.write_text("alice cat 1 2\nbob dog 0 7\n")
+    analyzer = LogAnalyzer(str(log_path), str(tmp_path / 'state.json'))
+    analyzer.update()
+    log_path.write_text("alice cat 1 2\n")
+    analyzer.update()
+    assert analyzer.words['cat'] == [2, 2, 2]
+
+def test_table_orders_levels_by_win_rate(tmp_path):
+    analyzer = LogAnalyzer(str(tmp_path / 'logs.txt'), str(tmp_path / 'state.json'))
+    for difficulty in range(1, 11):
+        wins = 100 - 10*difficulty if difficulty != 3 else 5 # difficulty 3 is really the hardest
+        analyzer.add([(f"word{difficulty}", int(idx < wins), difficulty) for idx in range(100)])
+    analyzer.add([('easy', 1, 10)]*30)
+    table = analyzer.get_table()
+    # the easy word's wins lift difficulty 10 above 8 and 9
+    assert table['levels'] == {'Easy': [1, 2, 4], 'Medium': [5, 6, 7, 10], 'Hard': [3, 8, 9]}
+    assert sorted(sum(table['levels'].values(), [])) == list(range(1, 11))
+    assert table['words']['easy'] == 2 # smoothed towards the rate of difficulty 10
+    assert table['buckets']['3,5'] == {'games': 100, 'wins': 5, 'win_rate': 0.05}
@@ -0,0 +1,90 @@
+import builtins
+import pytest
+pytest.importorskip('ipywidgets')
+from hangman.app import App, set_value
+from hangman.engine import GameState
+from hangman.game import HangmanGame
+from hangman.image import HangmanImage, get_frames
+from hangman.seen import SeenWords
+from hangman.words import WordStore
+
+class FakeHistory:
+    def __init__(self):
+        self.games = []
+    def add_game(self, player, score):
+        self.games.append((player, score))
+    def get_player_stats(self, player):
+        return '0%', sum(score for name, score in self.games if name == player)
+    def get_seen_words(self, player):
+        return SeenWords()
+    def get_leaderboard_snapshot(self, num_players):
+        return [('<b>bob</b>', 1, 1, 42, '100%')]
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(builtins, 'display', lambda *args: None, raising=False)
+    store = WordStore.from_words(('hangman', difficulty) for difficulty in range(1, 11))
+    game = HangmanGame.from_state(GameState('hangman', 2), 'Medium', 'Easy', store)
+    app = App(game, HangmanImage('svg'), FakeHistory(), True)
+    app.set_player('alice')
+    app.get_app()
+    return app
+
+def record_changes(app, names):
+    changes = []
+    for name in names:
+        getattr(app, name).observe(lambda change, name=name: changes.append((name, change['name'])))
+    return changes
+
+WATCHED = ['mystery_word', 'remaining_guesses_text', 'hangman_image', 'player_name_text',
+           'player_score', 'message', 'difficulty_setter', 'word_length_setter', 'guess_word', 'app']
+
+def click(app, letter):
+    app.letter_buttons[ord(letter) - 97].click()
+
+def test_correct_guess_only_updates_the_word(app):
+    tree, image = app.app, app.hangman_image
+    changes = record_changes(app, WATCHED)
+    click(app, 'a')
+    assert changes == [('mystery_word', 'value')]
+    assert app.app is tree and app.hangman_image is image # the widget tree is never rebuilt
+    assert app.letter_buttons[0].disabled
+
+def test_wrong_guess_updates_the_image_and_guesses(app):
+    changes = record_changes(app, WATCHED)
+    click(app, 'z')
+    assert sorted(set(changes)) == [('difficulty_setter', 'disabled'), ('hangman_image', 'value'),
+                                    ('remaining_guesses_text', 'value'), ('word_length_setter', 'disabled')]
+    assert app.hangman_image.value == get_frames('svg')[1]
+
+def test_win_records_the_game(app):
+    for letter in 'hangm':
+        click(app, letter)
+    assert app.game.status == 1
+    assert app.history.games == [('alice', 2 * 7 * 6)]
+    assert app.message.layout.display is None and app.play_again.layout.display is None
+    assert all(button.disabled for button in app.letter_buttons)
+    assert app.guess_word.disabled
+
+def test_reset_reuses_the_widgets(app):
+    tree = app.app
+    click(app, 'z')
+    app.reset()
+    assert app.app is tree
+    assert app.image.idx == 0 and app.hangman_image.value == get_frames('svg')[0]
+    assert not any(button.disabled for button in app.letter_buttons)
+    assert app.game.remaining_guesses == 6
+
+def test_scoreboard_escapes_player_names(app):
+    app.show_scoreboard(None)
+    assert '&lt;b&gt;bob&lt;/b&gt;' in app.scoreboard_table.value
+    assert app.hangman_image.layout.display == 'none'
+    app.show_scoreboard(None)
+    assert app.scoreboard_table.layout.display == 'none'
+
+def test_set_value_skips_unchanged_traits(app):
+    changes = record_changes(app, ['mystery_word'])
+    set_value(app.mystery_word, app.mystery_word.value)
+    assert changes == []
+    set_value(app.mystery_word, 'new')
+    assert changes == [('mystery_word', 'value')]
@@ -0,0 +1,74 @@
+import time
+import pytest
+from stub_server import start
+from hangman.client import CircuitBreaker, WordClient, WordSourceUnavailable
+from hangman.words import WordStore
+
+@pytest.fixture
+def stub():
+    store = WordStore.from_words([('cat', 1), ('dog', 1), ('hen', 1), ('lamb', 1), ('zebra', 2)])
+    server, url = start(store)
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+def test_breaker_half_open_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == 'half-open'
+    assert breaker.allow()
+    assert not breaker.allow() # only a single trial while half open
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+def test_breaker_successful_trial_closes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow() and breaker.allow()
+
+def test_word_at_falls_back_to_cache(stub, tmp_path):
+    server, url = stub
+    client = WordClient(url, retries=1, backoff=0, failure_threshold=1, reset_timeout=60,
+                        cache_path=str(tmp_path / 'cache.db'))
+    word = client.word_at(1, 3, 1)
+    assert word == 'dog'
+    server.fail_rate = 1.0
+    assert client.word_at(1, 3, 1) == 'dog'
+    assert client.breaker.state == 'open'
+    assert client.word_at(1, 3, 2) == 'dog' # any cached word in the bucket
+    with pytest.raises(WordSourceUnavailable):
+        client.word_at(2, 5, 0) # nothing cached for this bucket
+
+def test_word_at_retries_server_errors(stub, tmp_path):
+    server, url = stub
+    server.fail_rate = 1.0
+    client = WordClient(url, retries=2, backoff=0, failure_threshold=5, cache_path=None)
+    with pytest.raises(WordSourceUnavailable):
+        client.word_at(1, 3, 0)
+    assert client.breaker.failures == 1
+    server.fail_rate = 0.0
+    assert client.word_at(1, 3, 0) == 'cat'
+    assert client.breaker.failures == 0
@@ -0,0 +1,73 @@
+import json
+import pytest
+from stub_server import start
+from hangman.client import WordSourceUnavailable
+from hangman.counts import CountsBuilder, BUCKETS
+from hangman.words import WordStore
+
+def test_build_resumes_from_checkpoint(tmp_path):
+    store = WordStore.from_words([('cat', 1), ('dog', 1), ('lamb', 1), ('zebra', 2), ('ox', 10)])
+    server, url = start(store)
+    try:
+        finished = BUCKETS[:len(BUCKETS)//2]
+        checkpoint = {f"{dif},{length}": [99, 1.0] for dif, length in finished}
+        (tmp_path / 'checkpoint.json').write_text(json.dumps(checkpoint))
+        builder = CountsBuilder(url, path=str(tmp_path / 'counts.json'),
+                                checkpoint_path=str(tmp_path / 'checkpoint.json'))
+        fetched = []
+        fetch_bucket = builder.fetch_bucket
+        def record(dif, length):
+            fetched.append((dif, length))
+            return fetch_bucket(dif, length)
+        builder.fetch_bucket = record
+        counts = builder.build()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert sorted(fetched) == sorted(BUCKETS[len(BUCKETS)//2:])
+    for dif, length in finished:
+        assert counts[dif][length] == 99 # kept from the checkpoint, not fetched again
+    assert counts[10][2] == 1
+    assert json.loads((tmp_path / 'counts.json').read_text()) == counts
+    saved = json.loads((tmp_path / 'checkpoint.json').read_text())
+    assert len(saved) == len(BUCKETS)
+
+def test_failed_buckets_are_retried(tmp_path):
+    store = WordStore.from_words([('cat', 1)])
+    server, url = start(store, fail_rate=1.0)
+    try:
+        builder = CountsBuilder(url, path=str(tmp_path / 'counts.json'),
+                                checkpoint_path=str(tmp_path / 'checkpoint.json'))
+        builder.client.retries = 0
+        builder.client.breaker.failure_threshold = len(BUCKETS) + 1
+        with pytest.raises(WordSourceUnavailable):
+            builder.build()
+        assert builder.missing_buckets() == BUCKETS
+        server.fail_rate = 0.0
+        builder.client.breaker.record_success()
+        counts = builder.build()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert counts[1][3] == 1
+    assert not builder.missing_buckets()
+
+def test_stale_counts_are_refreshed_in_background(tmp_path, monkeypatch):
+    import time
+    from hangman.counts import CHECKPOINT_FILE, COUNTS_FILE
+    from hangman.words import HttpWordSource
+    monkeypatch.chdir(tmp_path)
+    stale = {f"{dif},{length}": [99, 1.0] for dif, length in BUCKETS}
+    (tmp_path / CHECKPOINT_FILE).write_text(json.dumps(stale))
+    (tmp_path / COUNTS_FILE).write_text(json.dumps([[99]*11 for _ in range(11)]))
+    server, url = start(WordStore.from_words([('cat', 1), ('dog', 1)]), delay=0.05)
+    try:
+        source = HttpWordSource(url, max_age=60)
+        assert source.count(1, 3) == 99 # games keep the current counts meanwhile
+        deadline = time.monotonic() + 10
+        while source.count(1, 3) == 99 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert source.count(1, 3) == 2 and source.count(2, 3) == 0
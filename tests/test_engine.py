@@ -0,0 +1,79 @@
+import pytest
+from hangman.engine import GameState, MAX_GUESSES, MAX_SCORED_LETTERS, play_batch
+
+def test_correct_and_incorrect_letters():
+    state = GameState('hangman')
+    assert state.guess('a')
+    assert state.get_pattern() == list('_a___a_')
+    assert not state.guess('z')
+    assert state.remaining_guesses == MAX_GUESSES - 1
+    assert not state.guess('a') # a repeated letter costs a guess
+    assert state.remaining_guesses == MAX_GUESSES - 2
+    assert state.status == 0
+
+def test_win_by_letters_updates_pattern_in_place():
+    state = GameState('Hangman', 2)
+    pattern = state.get_pattern()
+    for letter in 'hangm':
+        state.guess(letter)
+    assert state.status == 1
+    assert pattern == list('Hangman')
+    assert state.calculate_score() == 2 * 7 * MAX_GUESSES
+
+def test_win_by_word_is_case_insensitive():
+    state = GameState('hangman')
+    state.get_display()
+    assert state.guess('HANGMAN')
+    assert state.status == 1
+    assert state.get_display() == 'h a n g m a n'
+
+def test_wrong_word_and_loss():
+    state = GameState('cat')
+    assert not state.guess('dog')
+    for letter in 'bdefg':
+        state.guess(letter)
+    assert (state.status, state.remaining_guesses, state.calculate_score()) == (-1, 0, 0)
+    assert not state.guess('c') # guesses after the game has ended are ignored
+    assert state.get_pattern() == list('___')
+
+def test_phrase_display_and_score():
+    state = GameState('break a leg')
+    assert state.get_display() == '_ _ _ _ _   _   _ _ _'
+    for letter in 'breaklg':
+        state.guess(letter)
+    assert state.get_display() == 'b r e a k   a   l e g'
+    assert state.status == 1
+    assert state.calculate_score() == 9 * MAX_GUESSES # spaces are not scored
+
+def test_long_phrase_score_is_capped():
+    phrase = 'the quick brown fox jumps over the lazy dog'
+    state = GameState(phrase, 3)
+    assert state.guess(phrase)
+    assert state.calculate_score() == 3 * MAX_SCORED_LETTERS * MAX_GUESSES
+
+@pytest.mark.parametrize('guesses', ['', 'az', 'aqxz', 'hangm', 'qxzjkv'])
+def test_restore_matches_played_game(guesses):
+    state = GameState('hangman', 3)
+    for letter in guesses:
+        state.guess(letter)
+    restored = GameState.restore('hangman', 3, state.guessed, state.remaining_guesses, state.status)
+    for name in ('revealed', 'guessed', 'remaining_guesses', 'status'):
+        assert getattr(restored, name) == getattr(state, name)
+    assert restored.get_display() == state.get_display()
+
+def test_play_batch():
+    games = [('cat', 'cat'), ('cat', 'bdefgh'), ('dog', ['dog', 'x']), ('bird', 'b')]
+    result = play_batch(games, [1, 1, 2, 1])
+    assert list(result.status) == [1, -1, 1, 0]
+    assert list(result.remaining_guesses) == [MAX_GUESSES, 0, MAX_GUESSES, MAX_GUESSES]
+    assert list(result.score) == [3 * MAX_GUESSES, 0, 2 * 3 * MAX_GUESSES, 0]
+    assert list(result.num_guesses) == [3, 6, 1, 1]
+
+def test_play_batch_matches_game_state():
+    games = [('hangman', 'aeiounhgm'), ('python', 'zqxjpython')]
+    result = play_batch(games)
+    for idx, (target_word, guesses) in enumerate(games):
+        state = GameState(target_word)
+        for letter in guesses:
+            state.guess(letter)
+        assert (result.status[idx], result.score[idx]) == (state.status, state.calculate_score())
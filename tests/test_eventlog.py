@@ -0,0 +1,87 @@
+import gzip
+import time
+import pytest
+from hangman.eventlog import EventLog, GuessEvent, ResultEvent, RotatingFile, read_events
+
+def test_events_are_buffered_until_full(tmp_path):
+    path = tmp_path / 'logs.txt'
+    event_log = EventLog(str(path), buffer_size=30, flush_interval=None)
+    event_log.log_result('alice', 12, 'cat', 3)
+    assert not path.exists()
+    event_log.log_result('bob', 0, 'break a leg', 7)
+    assert path.read_text() == "alice cat 1 3\nbob break_a_leg 0 7\n"
+    event_log.log_result('carol', 5, 'dog', 1)
+    event_log.close()
+    assert path.read_text().endswith("carol dog 1 1\n")
+
+def test_events_are_flushed_after_the_interval(tmp_path):
+    path = tmp_path / 'logs.txt'
+    event_log = EventLog(str(path), flush_interval=0.05)
+    event_log.log_result('alice', 12, 'cat', 3)
+    deadline = time.time() + 5
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert path.read_text() == "alice cat 1 3\n"
+    assert event_log.timer is None
+    event_log.close()
+
+def test_binary_log_round_trip(tmp_path):
+    binary_path = str(tmp_path / 'logs.bin')
+    event_log = EventLog(str(tmp_path / 'logs.txt'), binary_path, flush_interval=None)
+    event_log.log_guess('Zoë', 'café', 'é', True, 6, 1.5)
+    event_log.log_guess('Zoë', 'café', 'café', False, 5, 0.25)
+    event_log.log_result('Zoë', 0, 'café', 9)
+    event_log.close()
+    events = list(read_events(binary_path))
+    assert [event[1:] for event in events] == [(1.5, 1, 6, 'Zoë', 'café', 'é'),
+                                              (0.25, 0, 5, 'Zoë', 'café', 'café'),
+                                              (0, 0, 9, 'Zoë', 'café')]
+    assert [type(event) for event in events] == [GuessEvent, GuessEvent, ResultEvent]
+    assert all(abs(event.time - time.time()) < 60 for event in events)
+
+def test_guesses_are_skipped_without_a_binary_log(tmp_path):
+    event_log = EventLog(str(tmp_path / 'logs.txt'), flush_interval=None)
+    event_log.log_guess('alice', 'cat', 'c', True, 6, 1.0)
+    assert event_log.buffered == 0
+    event_log.close()
+
+def test_partial_final_record_is_ignored(tmp_path):
+    binary_path = tmp_path / 'logs.bin'
+    event_log = EventLog(str(tmp_path / 'logs.txt'), str(binary_path), flush_interval=None)
+    event_log.log_result('alice', 12, 'cat', 3)
+    event_log.log_result('bob', 0, 'dog', 2)
+    event_log.close()
+    data = binary_path.read_bytes()
+    binary_path.write_bytes(data[:-2])
+    assert [event.player for event in read_events(str(binary_path))] == ['alice']
+    binary_path.write_bytes(data + b'\x09')
+    with pytest.raises(ValueError):
+        list(read_events(str(binary_path)))
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_rotation_keeps_the_newest_backups(tmp_path, compress):
+    path = str(tmp_path / 'logs.txt')
+    rotating_file = RotatingFile(path, max_bytes=10, backups=2, compress=compress)
+    for idx in range(5):
+        rotating_file.write(f"line {idx}\n".encode()) # each line fills a file
+    rotating_file.close()
+    suffix = '.gz' if compress else ''
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['logs.txt', f'logs.txt.1{suffix}', f'logs.txt.2{suffix}']
+    opener = gzip.open if compress else open
+    with opener(f"{path}.2{suffix}", 'rb') as f:
+        assert f.read() == b"line 2\n"
+    with opener(f"{path}.1{suffix}", 'rb') as f:
+        assert f.read() == b"line 3\n"
+    with open(path, 'rb') as f:
+        assert f.read() == b"line 4\n"
+
+def test_rotated_binary_segments_are_readable(tmp_path):
+    binary_path = str(tmp_path / 'logs.bin')
+    event_log = EventLog(str(tmp_path / 'logs.txt'), binary_path, buffer_size=1, flush_interval=None,
+                         max_bytes=100, backups=10)
+    for idx in range(10):
+        event_log.log_result(f"player{idx}", idx, 'hangman', 4)
+    event_log.close()
+    segments = sorted(tmp_path.glob('logs.bin.*.gz'), key=lambda path: -int(path.name.split('.')[2]))
+    players = [event.player for path in segments + [tmp_path / 'logs.bin'] for event in read_events(str(path))]
+    assert players == [f"player{idx}" for idx in range(10)]
@@ -0,0 +1,92 @@
+import json
+import os
+import pytest
+from hangman.history import History
+
+def reopen(history):
+    history.finish_compaction()
+    if history.log_file is not None:
+        history.log_file.close()
+    return History(history.path, history.compact_every)
+
+def add_games(history, games):
+    for player, score in games:
+        history.add_game(player, score)
+
+GAMES = [('alice', 30), ('bob', 0), ('alice', 12), ('carol', 18), ('bob', 24)]
+TOTALS = {'alice': [2, 2, 42], 'bob': [2, 1, 24], 'carol': [1, 1, 18]}
+
+def test_replays_the_log_without_a_snapshot(tmp_path):
+    history = History(str(tmp_path / 'h.json'), compact_every=100)
+    add_games(history, GAMES)
+    assert not os.path.exists(history.path)
+    restored = reopen(history)
+    assert restored.players == TOTALS
+    assert restored.get_top_players(2) == ['alice', 'bob']
+    assert restored.get_player_rank('carol', 'day') == 3
+
+def test_compaction_writes_a_snapshot_and_removes_the_old_log(tmp_path):
+    history = History(str(tmp_path / 'h.json'), compact_every=4)
+    add_games(history, GAMES)
+    history.finish_compaction()
+    with open(history.path) as f:
+        snapshot = json.load(f)
+    assert snapshot['generation'] == 1 == history.generation
+    assert snapshot['players'] == {'alice': [2, 2, 42], 'bob': [1, 0, 0], 'carol': [1, 1, 18]}
+    assert not os.path.exists(history.get_log_path(0))
+    assert history.logged == 1
+    restored = reopen(history)
+    assert restored.players == TOTALS
+    assert restored.get_player_rank('alice', 'week') == 1
+
+def test_compacts_no_more_often_than_there_are_players(tmp_path):
+    history = History(str(tmp_path / 'h.json'), compact_every=1)
+    add_games(history, [(f"player{idx}", idx) for idx in range(5)])
+    assert history.generation == 1 # after the first game, not again while every game adds a player
+    add_games(history, [(f"player{idx}", idx) for idx in range(4)])
+    assert history.generation == 2 and history.logged == 3
+    reopen(history)
+
+def test_replays_every_log_when_a_snapshot_was_not_written(tmp_path):
+    path = str(tmp_path / 'h.json')
+    with open(f"{tmp_path / 'h'}.0.log", 'w') as f:
+        f.write(json.dumps(['alice', 30, 0.0]) + '\n')
+    with open(f"{tmp_path / 'h'}.1.log", 'w') as f:
+        f.write(json.dumps(['alice', 12, 0.0]) + '\n' + '["bob", 2')
+    history = History(path)
+    assert history.players == {'alice': [2, 2, 42]}
+    assert history.generation == 1
+    history.add_game('bob', 5)
+    assert reopen(history).players == {'alice': [2, 2, 42], 'bob': [1, 1, 5]}
+
+def test_loads_the_pandas_snapshot(tmp_path):
+    path = str(tmp_path / 'h.json')
+    with open(path, 'w') as f:
+        json.dump({'Player': {'0': 'alice'}, 'Games Played': {'0': 3}, 'Games Won': {'0': 2},
+                   'Total Score': {'0': 50}}, f)
+    history = History(path)
+    assert history.players == {'alice': [3, 2, 50]}
+    assert history.get_player_stats('alice') == ('66.67%', 50)
+
+def test_snapshot_errors_are_raised_and_no_games_are_lost(tmp_path):
+    path = tmp_path / 'h.json'
+    path.mkdir() # the snapshot can't replace a directory
+    history = History(str(path), compact_every=2)
+    add_games(history, GAMES[:2])
+    with pytest.raises(OSError):
+        history.finish_compaction()
+    history.add_game(*GAMES[2])
+    history.finish_compaction()
+    history.log_file.close()
+    os.rmdir(path)
+    assert History(str(path)).players == {'alice': [2, 2, 42], 'bob': [1, 0, 0]}
+
+def test_leaderboard_snapshot_is_cached_until_a_game_is_added(tmp_path):
+    history = History(str(tmp_path / 'h.json'))
+    add_games(history, GAMES)
+    rows = history.get_leaderboard_snapshot(2)
+    assert rows == [['alice', 2, 2, 42, '100.00%'], ['bob', 2, 1, 24, '50.00%']]
+    assert history.get_leaderboard_snapshot(2) is rows
+    history.add_game('carol', 30)
+    assert history.get_leaderboard_snapshot(2)[0][0] == 'carol'
+    reopen(history)
@@ -0,0 +1,41 @@
+from xml.etree import ElementTree
+import pytest
+from hangman.image import BODY_PARTS, SIZE, BORDER, HangmanImage, get_frames
+
+def test_svg_frames_add_one_body_part_each():
+    frames = get_frames('svg')
+    assert len(frames) == len(BODY_PARTS) + 1
+    counts = []
+    for frame in frames:
+        root = ElementTree.fromstring(frame)
+        assert root.get('width') == root.get('height') == str(SIZE + 2*BORDER)
+        counts.append(len(root))
+    assert counts == [5 + sum(len(shapes) for shapes in BODY_PARTS[:idx]) for idx in range(len(frames))]
+
+def test_frames_are_rendered_once():
+    assert get_frames('svg') is get_frames('svg')
+
+@pytest.mark.parametrize('fmt', ['png', 'png-indexed'])
+def test_png_frames(fmt):
+    Image = pytest.importorskip('PIL.Image')
+    from io import BytesIO
+    frames = get_frames(fmt)
+    assert len(frames) == len(BODY_PARTS) + 1 and len(set(frames)) == len(frames)
+    image = Image.open(BytesIO(frames[-1]))
+    assert image.size == (SIZE + 2*BORDER,)*2
+    assert image.mode == ('1' if fmt == 'png-indexed' else 'RGB')
+
+def test_draw_next_stops_at_the_last_frame():
+    image = HangmanImage('svg')
+    assert image.widget_format == 'svg+xml'
+    frames = get_frames('svg')
+    assert image.get_encoded_image() == frames[0]
+    for idx in range(1, len(BODY_PARTS) + 3):
+        image.draw_next()
+        assert image.get_encoded_image() == frames[min(idx, len(BODY_PARTS))]
+
+def test_reset_keeps_the_format():
+    image = HangmanImage('svg')
+    image.draw_next()
+    image.__init__()
+    assert (image.fmt, image.idx) == ('svg', 0)
@@ -0,0 +1,42 @@
+import random
+import pytest
+from hangman.leaderboard import Leaderboard, SkipList
+
+def test_skiplist_index_and_getitem_match_sorted_order():
+    rng = random.Random(0)
+    skiplist, values = SkipList(), []
+    for _ in range(2000):
+        if values and rng.random() < 0.3:
+            value = values.pop(rng.randrange(len(values)))
+            skiplist.remove(value)
+        else:
+            value = (rng.randrange(1000), rng.random())
+            values.append(value)
+            skiplist.insert(value)
+    values.sort()
+    assert len(skiplist) == len(values)
+    assert list(skiplist) == values
+    for idx, value in enumerate(values):
+        assert skiplist.index(value) == idx
+        assert skiplist[idx] == value
+
+def test_skiplist_missing_values():
+    skiplist = SkipList()
+    skiplist.insert(1)
+    with pytest.raises(ValueError):
+        skiplist.index(2)
+    with pytest.raises(ValueError):
+        skiplist.remove(0)
+    with pytest.raises(IndexError):
+        skiplist[1]
+
+def test_leaderboard_rank_and_top():
+    leaderboard = Leaderboard()
+    leaderboard.set('ann', 30)
+    leaderboard.set('bob', 50)
+    leaderboard.add('cy', 10)
+    leaderboard.add('ann', 30)
+    assert leaderboard.top(2) == [('ann', 60), ('bob', 50)]
+    assert [leaderboard.rank(player) for player in ('ann', 'bob', 'cy', 'dee')] == [1, 2, 3, None]
+    leaderboard.remove('bob')
+    assert leaderboard.rank('cy') == 2
@@ -0,0 +1,67 @@
+import json
+import pytest
+from hangman import metrics
+from hangman.engine import GameState
+from hangman.game import HangmanGame
+from hangman.metrics import BUCKETS, Histogram, Registry
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.reset()
+    yield
+    metrics.disable()
+    metrics.registry.reset()
+
+def test_percentiles_fall_within_the_observed_buckets():
+    hist = Histogram()
+    assert hist.percentile(50) == 0.0
+    for _ in range(90):
+        hist.observe(0.001)
+    for _ in range(10):
+        hist.observe(0.1)
+    assert BUCKETS[0] < hist.percentile(50) <= 0.001 * 1.25
+    assert 0.1 / 1.25 <= hist.percentile(99) <= 0.1 * 1.25
+    assert hist.count == 100 and hist.sum == pytest.approx(1.09)
+
+def test_snapshot_and_json():
+    registry = Registry()
+    with registry.timer('work'):
+        pass
+    registry.inc('errors', 2)
+    snapshot = registry.snapshot()
+    assert snapshot['histograms']['work']['count'] == 1
+    assert set(snapshot['histograms']['work']) == {'count', 'mean', 'p50', 'p95', 'p99'}
+    assert snapshot['counters'] == {'errors': 2}
+    assert json.loads(registry.to_json()) == snapshot
+
+def test_prometheus_format():
+    registry = Registry()
+    registry.observe('guess', 2e-6)
+    registry.observe('guess', 1.0)
+    registry.inc('guess_errors')
+    lines = registry.to_prometheus().splitlines()
+    assert '# TYPE hangman_guess_seconds histogram' in lines
+    buckets = [line for line in lines if line.startswith('hangman_guess_seconds_bucket')]
+    assert len(buckets) == len(BUCKETS) + 1
+    counts = [int(line.split()[-1]) for line in buckets]
+    assert counts == sorted(counts) and counts[0] == 0 and counts[-1] == 2
+    assert 'hangman_guess_seconds_count 2' in lines
+    assert 'hangman_guess_errors_total 1' in lines
+
+def test_enable_and_disable():
+    original = HangmanGame.guess
+    metrics.enable([('hangman.game', 'HangmanGame', 'guess'), ('hangman.missing', 'Missing', 'method')])
+    assert metrics.is_enabled() and HangmanGame.guess is not original
+    metrics.enable([('hangman.game', 'HangmanGame', 'guess')]) # never wrapped twice
+    game = HangmanGame.from_state(GameState('cat'))
+    game.guess('c')
+    game.guess('x')
+    with pytest.raises(TypeError):
+        game.guess(None)
+    snapshot = metrics.registry.snapshot()
+    assert snapshot['histograms']['hangmangame_guess']['count'] == 3
+    assert snapshot['counters'] == {'hangmangame_guess_errors': 1}
+    metrics.disable()
+    assert not metrics.is_enabled() and HangmanGame.guess is original
+    game.guess('a')
+    assert metrics.registry.snapshot()['histograms']['hangmangame_guess']['count'] == 3
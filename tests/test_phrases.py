@@ -0,0 +1,42 @@
+import random
+from hangman import phrases
+from hangman.engine import MAX_GUESSES, MAX_SCORED_LETTERS
+from hangman.game import HangmanGame, PHRASE
+from hangman.phrases import PhraseSource
+from hangman.seen import SeenWords
+from hangman.words import WordStore
+
+def make_source(tmp_path):
+    path = tmp_path / 'phrases.txt'
+    path.write_text("Break  a Leg 1\nbite the bullet 1\nonce in a blue moon 1\n"
+                    "no difficulty\nout of range 11\nspill the beans 4\n")
+    return PhraseSource(str(path))
+
+def test_loads_and_normalizes_phrases(tmp_path):
+    source = make_source(tmp_path)
+    assert source.phrases[1] == ['break a leg', 'bite the bullet', 'once in a blue moon']
+    assert source.phrases[4] == ['spill the beans']
+    assert sum(map(len, source.phrases)) == 4
+    assert (source.count(1), source.count(1, 5), source.count(2)) == (3, 0, 0)
+
+def test_seen_phrases_are_not_repeated(tmp_path):
+    source, seen, rng = make_source(tmp_path), SeenWords(), random.Random(0)
+    first = [source.get_word(5, 8, 1, seen, rng) for _ in range(3)]
+    assert sorted(first) == sorted(source.phrases[1])
+    assert source.get_word(5, 8, 1, seen, rng) in first # every phrase has been seen, so they start again
+
+def test_bundled_phrases_cover_every_difficulty():
+    source = PhraseSource(phrases.BUNDLED_PHRASES)
+    assert all(source.count(difficulty) for difficulty in range(1, 11))
+
+def test_phrase_games(tmp_path, monkeypatch):
+    source = make_source(tmp_path)
+    source.add('hit the sack', 2)
+    source.add('under the weather', 3)
+    monkeypatch.setattr(phrases, '_default_phrase_source', source)
+    game = HangmanGame(PHRASE, 'Easy', WordStore.from_words([])) # phrases never use the word source
+    assert game.target_word in source.phrases[game.current_difficulty]
+    assert game.display.count('\u00a0') == game.target_word.count(' ')
+    assert game.guess(game.target_word.upper())
+    num_letters = len(game.target_word.replace(' ', ''))
+    assert game.calculate_score() == game.current_difficulty * min(num_letters, MAX_SCORED_LETTERS) * MAX_GUESSES
@@ -0,0 +1,94 @@
+import threading
+import time
+from hangman.pool import WordPool
+from hangman.seen import SeenWords
+from hangman.words import WordStore
+
+WORDS = ['cat', 'dog', 'cow', 'pig']
+
+class GatedSource(WordStore):
+    """A word store whose lookups wait until the gate is opened, like a slow API."""
+    def __init__(self, words, error = None):
+        super().__init__(path=None)
+        for word in words:
+            self.add(word, 1)
+        self.gate = threading.Event()
+        self.error = error
+
+    def word_at(self, difficulty, length, index):
+        self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return super().word_at(difficulty, length, index)
+
+def wait_until(condition):
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+def test_misses_are_refilled_in_the_background():
+    source = GatedSource(WORDS)
+    source.gate.set()
+    pool = WordPool(source, depth=2)
+    assert pool.get_word(3, 4, 1) in WORDS
+    assert (pool.hits, pool.misses) == (0, 1)
+    wait_until(lambda: pool.stats()['ready'] == 2)
+    assert pool.get_word(3, 4, 1) in WORDS
+    assert (pool.hits, pool.misses) == (1, 1)
+
+def test_misses_use_the_fallback_without_waiting():
+    source = GatedSource(WORDS)
+    pool = WordPool(source, fallback=WordStore.from_words([('elk', 1)]))
+    start = time.perf_counter()
+    assert pool.get_word(3, 4, 1) == 'elk'
+    seen = SeenWords()
+    assert pool.get_word(3, 4, 1, seen) == 'elk' # the player's word isn't ready yet
+    assert time.perf_counter() - start < 1
+    assert pool.stats()['misses'] == 2
+    source.gate.set()
+    wait_until(lambda: pool.stats()['ready'] == 3)
+
+def test_failed_refills_are_counted():
+    source = GatedSource(WORDS, error=OSError('API unavailable'))
+    source.gate.set()
+    pool = WordPool(source, fallback=WordStore.from_words([('elk', 1)]))
+    pool.refill((3, 4, 1))
+    wait_until(lambda: pool.stats()['failures'] == 1)
+    assert pool.stats()['last_error'] == "OSError('API unavailable')"
+    assert pool.get_word(3, 4, 1) == 'elk'
+
+def test_players_get_prefetched_unseen_words():
+    source = GatedSource(WORDS)
+    source.gate.set()
+    pool, seen = WordPool(source), SeenWords()
+    pool.prefill('Short', 'Easy', seen)
+    wait_until(lambda: pool.stats()['ready'] == 1) # only difficulty 1 has words
+    words = []
+    for _ in range(len(WORDS)):
+        wait_until(lambda: pool.stats()['ready'] == 1)
+        words.append(pool.get_word(2, 5, 1, seen))
+    assert sorted(words) == sorted(WORDS)
+    assert pool.stats()['hits'] == len(WORDS)
+    wait_until(lambda: pool.stats()['failures'] == 2) # difficulties 2 and 3 have no words
+
+def test_prefetched_words_already_seen_are_not_served():
+    source = GatedSource(WORDS)
+    source.gate.set()
+    pool, seen = WordPool(source), SeenWords()
+    pool.prefetch((3, 4, 1), seen)
+    wait_until(lambda: pool.stats()['ready'] == 1)
+    (length, count, idx), = pool.next_unseen[seen].values()
+    seen.mark(1, length, count, idx) # another game gave the player this word
+    assert pool.get_word(3, 4, 1, seen) != WORDS[idx]
+
+def test_counters_are_consistent_across_threads():
+    source = GatedSource(WORDS)
+    source.gate.set()
+    pool = WordPool(source, depth=1)
+    threads = [threading.Thread(target=lambda: [pool.get_word(3, 4, 1) for _ in range(200)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pool.hits + pool.misses == 800
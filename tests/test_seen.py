@@ -0,0 +1,91 @@
+import random
+import pytest
+from hangman.seen import SeenWords, SeenIndex, BLOCK_SIZE
+from hangman.words import WordStore, WordSource
+
+@pytest.mark.parametrize('count', [1, 7, 8, 13, BLOCK_SIZE*8 + 3, 2000])
+def test_select_returns_every_index_once(count):
+    rng = random.Random(count)
+    seen = SeenWords()
+    chosen = [seen.select(1, 5, count, rng.randrange(seen.unseen(1, 5, count))) for _ in range(count)]
+    assert sorted(chosen) == list(range(count))
+    assert seen.unseen(1, 5, count) == 0
+
+def test_select_picks_the_rank_th_unseen_index():
+    seen = SeenWords()
+    for idx in (0, 2, 3, 9):
+        seen.mark(1, 5, 12, idx)
+    unseen = [1, 4, 5, 6, 7, 8, 10, 11]
+    assert [seen.find(1, 5, 12, rank) for rank in range(len(unseen))] == unseen
+    assert seen.select(1, 5, 12, 6) == 10
+    assert seen.is_seen(1, 5, 12, 10) and seen.unseen(1, 5, 12) == 7
+
+def test_bucket_restarts_when_word_list_changes():
+    seen = SeenWords()
+    seen.select(1, 5, 10, 0)
+    assert seen.unseen(1, 5, 10) == 9
+    assert seen.unseen(1, 5, 11) == 11
+
+def test_json_round_trip():
+    seen = SeenWords()
+    for rank in (3, 0, 5):
+        seen.select(2, 4, 20, rank)
+    restored = SeenWords.from_json(seen.to_json())
+    assert restored.buckets == seen.buckets
+
+def test_seen_index_saves_players(tmp_path):
+    path = str(tmp_path / 'seen.json')
+    index = SeenIndex(path, save_every=1)
+    index.get('ann').select(1, 3, 4, 2)
+    assert SeenIndex(path).get('ann').is_seen(1, 3, 4, 2)
+
+def test_get_word_never_repeats_until_exhausted():
+    words = ['cat', 'dog', 'hen', 'owl', 'lamb', 'bear']
+    store = WordStore.from_words((word, 1) for word in words)
+    seen = SeenWords()
+    drawn = [store.get_word(3, 5, 1, seen) for _ in range(len(words))]
+    assert sorted(drawn) == sorted(words)
+    assert store.get_word(3, 5, 1, seen) in words # starts again
+
+def test_failed_fetch_is_not_marked_seen():
+    class Failing(WordSource):
+        def count(self, difficulty, length):
+            return 5
+        def word_at(self, difficulty, length, index):
+            raise ConnectionError("words API unavailable")
+    seen = SeenWords()
+    with pytest.raises(ConnectionError):
+        Failing().get_word(3, 4, 1, seen)
+    assert seen.unseen(1, 3, 5) == 5
+
+def test_find_past_the_last_unseen_word_raises():
+    seen = SeenWords()
+    seen.mark(1, 3, 4, 1)
+    with pytest.raises(IndexError):
+        seen.find(1, 3, 4, 3)
+
+def test_concurrent_draws_share_one_player(tmp_path):
+    import threading
+    store = WordStore.from_words((word, 1) for word in ['cat', 'dog', 'hen', 'owl', 'pig', 'cow', 'elk'])
+    seen = SeenIndex(str(tmp_path / 'seen.json'), save_every=10).get('ann')
+    def draw():
+        for _ in range(3000):
+            store.get_word(3, 4, 1, seen)
+    threads = [threading.Thread(target=draw) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+
+def test_sqlite_history_merges_seen_words_between_processes(tmp_path):
+    from hangman.sqlite_history import SQLiteHistory
+    path = str(tmp_path / 'history.db')
+    first, second = SQLiteHistory(path), SQLiteHistory(path)
+    first.get_seen_words('ann').select(1, 3, 10, 0)
+    second.get_seen_words('ann').select(1, 3, 10, 8)
+    first.seen_index.save()
+    second.seen_index.save()
+    seen = SQLiteHistory(path).get_seen_words('ann')
+    assert seen.is_seen(1, 3, 10, 0) and seen.is_seen(1, 3, 10, 8)
+    assert seen.unseen(1, 3, 10) == 8
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import pytest
+from hangman.eventlog import EventLog, read_events
+from hangman.history import History
+from hangman.server import GameServer
+from hangman.words import WordStore
+
+WORDS = ['cat', 'dog', 'bird', 'fish', 'horse', 'rabbit', 'hamster', 'elephant', 'crocodile', 'chimpanzee']
+
+@pytest.fixture
+def server(tmp_path):
+    event_log = EventLog(str(tmp_path / 'logs.txt'), str(tmp_path / 'logs.bin'), flush_interval=None)
+    history = History(str(tmp_path / 'h.json'), event_log=event_log)
+    store = WordStore.from_words((word, difficulty) for word in WORDS for difficulty in range(1, 11))
+    server = GameServer(history, store, sessions_path=str(tmp_path / 'sessions.bin'))
+    yield server
+    server.history_executor.shutdown()
+    event_log.close()
+
+def request(server, method, target, body = None):
+    return asyncio.run(server.route(method, target, json.dumps(body).encode() if body is not None else b''))
+
+def start(server, player = 'alice', **settings):
+    status, state = request(server, 'POST', '/games', dict(settings, player=player))
+    assert status == 201
+    return state['id'], server.sessions[state['id']].game.target_word
+
+def test_play_a_game_to_a_win(server, tmp_path):
+    session_id, target_word = start(server, word_length='Short', difficulty='Easy')
+    assert 3 <= len(target_word) <= 5
+    status, state = request(server, 'POST', f"/games/{session_id}/guess", {'guess': 'q' if 'q' not in target_word else 'z'})
+    assert (status, state['remaining_guesses'], state['image']) == (200, 5, '/image/1.svg')
+    for letter in sorted(set(target_word)):
+        status, state = request(server, 'POST', f"/games/{session_id}/guess", {'guess': letter.upper()})
+    assert (state['status'], state['word']) == (1, target_word)
+    assert request(server, 'GET', '/scoreboard') == (200, [{'player': 'alice', 'score': server.history.players['alice'][2]}])
+    server.history.event_log.flush()
+    events = list(read_events(str(tmp_path / 'logs.bin')))
+    assert [type(event).__name__ for event in events] == ['GuessEvent']*(len(set(target_word)) + 1) + ['ResultEvent']
+    assert (tmp_path / 'logs.txt').read_text().split()[:3] == ['alice', target_word, '1']
+
+def test_guessing_a_word_and_resetting(server):
+    session_id, target_word = start(server, word_length='Long', difficulty='Hard')
+    status, state = request(server, 'POST', f"/games/{session_id}/guess", {'guess': target_word})
+    assert state['status'] == 1 and state['guessed_words'] == [target_word]
+    assert request(server, 'POST', f"/games/{session_id}/guess", {'guess': 'a'})[0] == 400 # the game is over
+    status, state = request(server, 'POST', f"/games/{session_id}/reset", {'word_length': 'Medium'})
+    assert status == 200 and state['status'] == 0 and state['guessed_words'] == []
+    assert (state['word_length'], state['difficulty']) == ('Medium', 'Hard')
+    assert 5 <= len(server.sessions[session_id].game.target_word) <= 8
+
+@pytest.mark.parametrize('method, target, body, status', [
+    ('POST', '/games', [], 400),
+    ('POST', '/games', {'player': ' '}, 400),
+    ('POST', '/games', {'player': 'alice', 'difficulty': 'Impossible'}, 400),
+    ('GET', '/games/unknown', None, 404),
+    ('GET', '/image/99.svg', None, 404),
+    ('GET', '/image/-1.svg', None, 404),
+    ('GET', '/image/x.svg', None, 400),
+    ('DELETE', '/games', None, 404),
+])
+def test_invalid_requests(server, method, target, body, status):
+    assert request(server, method, target, body)[0] == status
+
+def test_invalid_guesses(server):
+    session_id, target_word = start(server)
+    assert request(server, 'POST', f"/games/{session_id}/guess", {})[0] == 400
+    assert request(server, 'POST', f"/games/{session_id}/guess", {'guess': 'x' * (len(target_word) + 1)})[0] == 400
+
+def test_images(server):
+    status, (content_type, body, cache) = request(server, 'GET', '/image/6.svg')
+    assert (status, content_type) == (200, 'image/svg+xml') and body == server.frames[6]
+    assert 'immutable' in cache
+
+def test_sessions_survive_a_restart(server):
+    session_id, target_word = start(server, word_length='Medium')
+    request(server, 'POST', f"/games/{session_id}/guess", {'guess': 'z' if 'z' not in target_word else 'q'})
+    server.save_sessions()
+    restored = GameServer(server.history, server.word_source, sessions_path=server.sessions_path)
+    status, state = request(restored, 'GET', f"/games/{session_id}")
+    assert status == 200
+    assert state == request(server, 'GET', f"/games/{session_id}")[1]
+    restored.history_executor.shutdown()
+
+def test_keep_alive_connection(server):
+    async def exchange():
+        listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for body in (b'{"player": "carol"}', b'{'):
+            writer.write(b'POST /games HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body))
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+            responses.append((head.split(b' ')[1], json.loads(await reader.readexactly(length))))
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return responses
+    (created, session), (invalid, _) = asyncio.run(exchange())
+    assert (created, invalid) == (b'201', b'400')
+    assert session['player'] == 'carol'
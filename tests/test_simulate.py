@@ -0,0 +1,66 @@
+import json
+import random
+import pytest
+from hangman.engine import get_letter_masks
+from hangman.simulate import STRATEGIES, play_game, merge_stats, simulate
+from hangman.words import WordStore
+
+WORDS = ['cat', 'cot', 'cut', 'dog', 'dig', 'bird', 'bard', 'word', 'ward', 'fish', 'dish', 'wish',
+         'apple', 'ample', 'angle', 'ankle']
+
+def make_store():
+    return WordStore.from_words((word, difficulty) for word in WORDS for difficulty in (1, 2, 3))
+
+def make_dictionary():
+    dictionary = {}
+    for word in WORDS:
+        dictionary.setdefault(len(word), []).append(get_letter_masks(word))
+    return dictionary
+
+@pytest.mark.parametrize('name', sorted(STRATEGIES))
+def test_strategies_finish_every_game(name):
+    strategy, dictionary, rng = STRATEGIES[name](), make_dictionary(), random.Random(1)
+    for word in WORDS:
+        state = play_game(word, 2, strategy, dictionary, rng)
+        assert state.status in (1, -1)
+        guessed = {chr(97 + idx) for idx in range(26) if state.guessed >> idx & 1}
+        assert (state.status == 1) == (set(word) <= guessed)
+
+@pytest.mark.parametrize('name', ['frequency', 'entropy'])
+def test_informed_strategies_never_waste_guesses_on_a_known_word(name):
+    dictionary = {4: [get_letter_masks('fish')]}
+    state = play_game('fish', 1, STRATEGIES[name](), dictionary, random.Random(0))
+    assert state.status == 1 and state.remaining_guesses == 6
+
+def test_merge_stats():
+    totals = {}
+    merge_stats(totals, {'1,3': {'games': 2, 'wins': 1, 'remaining_guesses': 4, 'scores': {'0': 1, '18': 1}}})
+    merge_stats(totals, {'1,3': {'games': 1, 'wins': 1, 'remaining_guesses': 6, 'scores': {'18': 1}},
+                         '2,4': {'games': 1, 'wins': 0, 'remaining_guesses': 0, 'scores': {'0': 1}}})
+    assert totals['1,3'] == {'games': 3, 'wins': 2, 'remaining_guesses': 10, 'scores': {'0': 1, '18': 2}}
+    assert totals['2,4']['games'] == 1
+
+def test_simulate_is_deterministic(tmp_path):
+    kwargs = dict(strategy='frequency', games=120, word_length='Short', difficulty='Easy',
+                  chunk_size=25, processes=2, seed=7)
+    first = simulate(make_store(), output=str(tmp_path / 'first.jsonl'), **kwargs)
+    second = simulate(make_store(), output=str(tmp_path / 'second.jsonl'), **kwargs)
+    assert first == second
+    assert sum(bucket['games'] for bucket in first.values()) == 120
+    for key, bucket in first.items():
+        difficulty, length = map(int, key.split(','))
+        assert difficulty in (1, 2, 3) and 2 <= length <= 5
+        assert sum(bucket['scores'].values()) == bucket['games']
+        assert 0 <= bucket['win_rate'] <= 1
+
+def test_simulate_streams_every_chunk(tmp_path):
+    output = tmp_path / 'out.jsonl'
+    summary = simulate(make_store(), 'random', games=50, word_length='Short', difficulty='Easy',
+                       chunk_size=20, processes=1, output=str(output))
+    with open(output) as f:
+        chunks = [json.loads(line) for line in f]
+    assert sorted(chunk['chunk'] for chunk in chunks) == [0, 1, 2]
+    totals = {}
+    for chunk in chunks:
+        merge_stats(totals, chunk['stats'])
+    assert {key: bucket['games'] for key, bucket in totals.items()} == {key: bucket['games'] for key, bucket in summary.items()}
@@ -0,0 +1,47 @@
+import pytest
+from hangman.engine import GameState
+from hangman.game import HangmanGame
+from hangman.snapshot import pack_game, unpack_game, save_snapshots, load_snapshots
+
+def make_game(target_word, guesses = ()):
+    game = HangmanGame.from_state(GameState(target_word, 4), 'Medium', 'Easy')
+    for guess in guesses:
+        game.guess(guess)
+    return game
+
+def assert_same_state(restored, game):
+    for name in ('target_word', 'difficulty', 'guessed', 'revealed', 'remaining_guesses', 'status'):
+        assert getattr(restored.state, name) == getattr(game.state, name)
+    assert restored.word == game.word
+    assert (restored.word_length, restored.difficulty) == (game.word_length, game.difficulty)
+
+@pytest.mark.parametrize('guesses', [(), ('a', 'z'), ('h', 'a', 'n', 'g', 'm'), ('q', 'x', 'z', 'j', 'k', 'v')])
+def test_pack_unpack_round_trip(guesses):
+    game = make_game('hangman', guesses)
+    data = pack_game(game, frame=3, guessed_words=['hanger'], player='Zoë')
+    snapshot, offset = unpack_game(data)
+    assert offset == len(data)
+    assert_same_state(snapshot.game, game)
+    assert (snapshot.frame, snapshot.guessed_words, snapshot.player) == (3, ['hanger'], 'Zoë')
+
+def test_unpack_at_offset():
+    first, second = pack_game(make_game('cat', 'c')), pack_game(make_game('dog', 'x'), player='bob')
+    snapshot, offset = unpack_game(first + second, len(first))
+    assert offset == len(first) + len(second)
+    assert snapshot.game.target_word == 'dog' and snapshot.player == 'bob'
+
+def test_save_and_load_snapshots(tmp_path):
+    games = {'one': make_game('hangman', 'an'), 'two': make_game('break a leg', 'e')}
+    path = str(tmp_path / 'sessions.bin')
+    save_snapshots(path, {key: pack_game(game, player=key) for key, game in games.items()})
+    snapshots = load_snapshots(path)
+    assert list(snapshots) == list(games)
+    for key, game in games.items():
+        assert_same_state(snapshots[key].game, game)
+        assert snapshots[key].player == key
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'sessions.bin'
+    path.write_bytes(b'not a snapshot')
+    with pytest.raises(ValueError):
+        load_snapshots(str(path))
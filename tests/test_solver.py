@@ -0,0 +1,56 @@
+import pytest
+pytest.importorskip('numpy')
+from hangman.engine import GameState
+from hangman.game import HangmanGame
+from hangman.solver import Solver
+from hangman.words import WordStore
+
+WORDS = ['cat', 'cot', 'cut', 'dog', 'bird', 'bard', 'word', 'ward', 'Fish', 'fish']
+
+def test_dictionary_is_grouped_by_length():
+    solver = Solver(WORDS)
+    assert solver.words[3] == ['cat', 'cot', 'cut', 'dog']
+    assert solver.words[4] == ['bard', 'bird', 'fish', 'ward', 'word'] # duplicates and case are folded
+    assert solver.letter_counts[4][ord('r') - 97] == 4
+
+def test_from_store():
+    store = WordStore.from_words([('cat', 1), ('bird', 5)])
+    assert Solver.from_store(store).words == {3: ['cat'], 4: ['bird']}
+
+def test_update_narrows_candidates():
+    state = Solver(WORDS).start(4)
+    assert state.best_letter() == 'd' # ties with 'r' go to the earlier letter
+    state.update('__r_', [])
+    assert state.get_candidates() == ['bard', 'bird', 'ward', 'word']
+    state.update('__r_', ['a'])
+    assert state.get_candidates() == ['bird', 'word']
+    state.update('_or_', ['a'])
+    assert state.get_candidates() == ['word']
+    assert state.best_letter() == 'd'
+
+def test_pattern_positions_must_match_exactly():
+    state = Solver(['aab', 'aba', 'abb']).start(3)
+    state.update('a_a', [])
+    assert state.get_candidates() == ['aba']
+
+def test_no_candidates():
+    state = Solver(WORDS).start(4)
+    state.update('____', ['b', 'f', 'w'])
+    assert state.get_candidates() == []
+    assert state.best_letter() is None
+    assert Solver(WORDS).start(7).best_letter() is None
+
+def test_best_letter_skips_guessed_letters():
+    state = Solver(['cat']).start(3)
+    state.update('ca_', [])
+    assert state.best_letter() == 't'
+    state.update('cat', [])
+    assert state.best_letter() is None
+
+def test_hint_solves_a_game():
+    solver = Solver(WORDS)
+    game = HangmanGame.from_state(GameState('word'), 'Short', 'Easy')
+    state = solver.start(4)
+    while game.state.status == 0:
+        game.guess(state.hint(game))
+    assert game.state.status == 1
@@ -0,0 +1,65 @@
+from multiprocessing import get_context
+import threading
+import pytest
+from hangman.sqlite_history import SQLiteHistory
+
+def add_games(path, player, num_games, batch_size):
+    history = SQLiteHistory(path, batch_size=batch_size)
+    for idx in range(num_games):
+        history.add_game(player if idx % 2 else 'shared', idx % 3)
+    history.flush()
+    history.connection.close()
+
+def test_concurrent_processes_never_lose_updates(tmp_path):
+    path = str(tmp_path / 'history.db')
+    SQLiteHistory(path).connection.close() # creates the tables before the writers race
+    ctx = get_context('spawn')
+    writers = [ctx.Process(target=add_games, args=(path, f"player{idx}", 200, idx + 1)) for idx in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert [writer.exitcode for writer in writers] == [0]*4
+    history = SQLiteHistory(path)
+    stats = {row[0]: row[1:] for row in history.get_rows()}
+    assert stats['shared'] == [400, 264, 396]
+    for idx in range(4):
+        assert stats[f"player{idx}"] == [100, 67, 100]
+    assert history.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 800
+
+def test_threads_share_a_batched_history(tmp_path):
+    history = SQLiteHistory(str(tmp_path / 'history.db'), batch_size=7)
+    threads = [threading.Thread(target=lambda: [history.add_game('alice', 1) for _ in range(250)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert history.get_player_stats('alice') == ('100.00%', 1000)
+
+def test_batches_are_written_when_read(tmp_path):
+    history = SQLiteHistory(str(tmp_path / 'history.db'), batch_size=100)
+    history.add_game('alice', 10)
+    history.add_game('bob', 0)
+    history.log_game('alice', 10, 'hangman', 4)
+    assert history.commits == 0
+    assert history.get_top_players(2) == ['alice', 'bob']
+    assert history.commits == 1
+    assert history.get_player_rank('bob') == 2 == history.get_player_rank('bob', 'day')
+    assert history.get_player_rank('carol') is None
+    assert history.connection.execute("SELECT player, target_word, won FROM games").fetchall() == [('alice', 'hangman', 1)]
+
+def test_failed_flush_keeps_the_buffered_games(tmp_path, monkeypatch):
+    history = SQLiteHistory(str(tmp_path / 'history.db'), batch_size=100)
+    history.add_game('alice', 10)
+    class Failing:
+        def __enter__(self):
+            raise RuntimeError('database is locked')
+        def __exit__(self, *args):
+            pass
+    monkeypatch.setattr(history, 'transaction', Failing)
+    with pytest.raises(RuntimeError):
+        history.flush()
+    assert len(history.pending_games) == 1
+    monkeypatch.undo()
+    assert history.get_player_stats('alice') == ('100.00%', 10)